@@ -1,28 +1,83 @@
 """
 Manifest detection and dependency extraction helpers.
 
-Each handler returns a list of normalized dependency records:
-{
-    "ecosystem": "npm" | "pypi" | "maven" | "go" | "cargo" | ...,
-    "name": "package-name",
-    "version": "x.y.z",
-    "scope": "runtime" | "dev" | "test",
-    "manifest_path": "path/to/manifest"
-}
+Each handler fills a column-oriented ``DependencySet``; ``parse_manifest`` hands
+rows back to callers as normalized ``Dep`` records:
+
+    ecosystem: "npm" | "pypi" | "maven" | "go" | "cargo" | ...
+    name: "package-name"
+    version: "x.y.z"
+    scope: "runtime" | "dev" | "test"
+    manifest_path: "path/to/manifest"
+
+``Dep.as_dict()`` gives the same fields as a plain dict for JSON output.
 """
 
 from __future__ import annotations
 
-import json
+import hashlib
+import io
 import re
-import tomllib
+import threading
 import xml.etree.ElementTree as ET
-from pathlib import Path
-from typing import Callable, Dict, Iterable, List, Optional
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import json_compat
+
+try:
+    import lxml.etree as LET
+except ImportError:  # optional speedup for pom.xml parsing
+    LET = None
+
+try:
+    import rtoml as _toml
+
+    _TOML_ERRORS: Tuple[type, ...] = (_toml.TomlParsingError,)
+except ImportError:  # optional speedup for TOML manifests / poetry.lock
+    import tomllib as _toml
+
+    _TOML_ERRORS = (_toml.TOMLDecodeError,)
+
+
+@dataclass(slots=True)
+class Dep:
+    ecosystem: str
+    name: str
+    version: str
+    scope: str
+    manifest_path: str
+
+    def as_dict(self) -> Dict[str, str]:
+        return {
+            "ecosystem": self.ecosystem,
+            "name": self.name,
+            "version": self.version,
+            "scope": self.scope,
+            "manifest_path": self.manifest_path,
+        }
 
 
-Dependency = Dict[str, str]
-Handler = Callable[[str, str], List[Dependency]]
+Dependency = Dep
+Handler = Callable[[str, str], "DependencySet"]
+
+_VERSION_OP_CHARS = "~^><= \t"
+_PIN_OPS = frozenset(("==", ">=", "<=", "~=", "!="))
+_POM_NS = "{http://maven.apache.org/POM/4.0.0}"
+_XML_ERRORS = (ET.ParseError,) + ((LET.XMLSyntaxError,) if LET is not None else ())
+_XML_FEED_CHUNK = 1 << 16
+_GRADLE_RE = re.compile(
+    r"(implementation|api|compileOnly|runtimeOnly|testImplementation)\s+['\"]([^:]+):([^:]+):([^'\"]+)['\"]"
+)
+_GRADLE_SCOPES = {
+    "implementation": "runtime",
+    "api": "runtime",
+    "compileOnly": "runtime",
+    "runtimeOnly": "runtime",
+    "testImplementation": "test",
+}
+_GRADLE_CONFIGS = tuple(_GRADLE_SCOPES)
 
 
 def _clean_version(version: str) -> str:
@@ -30,77 +85,109 @@ def _clean_version(version: str) -> str:
         return str(version)
     v = version.strip()
     # Strip common semver operators for lookups/display.
-    v = re.sub(r"^[~^><=\\s]+", "", v)
+    v = v.lstrip(_VERSION_OP_CHARS)
     return v or version
 
 
-def _normalize_dep(ecosystem: str, name: str, version: str, scope: str, manifest_path: str) -> Dependency:
-    return {
-        "ecosystem": ecosystem,
-        "name": name.strip(),
-        "version": _clean_version(version),
-        "scope": scope,
-        "manifest_path": manifest_path,
-    }
+def _split_spec(spec: str) -> Tuple[str, str]:
+    """Split ``name<op>version`` at the first two-character pin operator.
+
+    Scans the string once instead of going through the regex engine; returns
+    ``(spec, "*")`` when no operator is present.
+    """
+    for i in range(len(spec) - 1):
+        if spec[i] in "=><~!" and spec[i:i + 2] in _PIN_OPS:
+            return spec[:i].rstrip(), spec[i + 2:].lstrip()
+    return spec, "*"
+
+
+@dataclass
+class DependencySet:
+    """Dependencies stored as parallel columns (struct-of-arrays).
+
+    Parsers append rows here instead of building one record per dependency; use
+    ``as_deps`` (or ``as_dicts``) where row-shaped records are needed.
+    """
+
+    ecosystems: List[str] = field(default_factory=list)
+    names: List[str] = field(default_factory=list)
+    versions: List[str] = field(default_factory=list)
+    scopes: List[str] = field(default_factory=list)
+    paths: List[str] = field(default_factory=list)
 
+    def append(self, ecosystem: str, name: str, version: str, scope: str, manifest_path: str) -> None:
+        self.ecosystems.append(ecosystem)
+        self.names.append(name.strip())
+        self.versions.append(_clean_version(version))
+        self.scopes.append(scope)
+        self.paths.append(manifest_path)
 
-def parse_package_json(content: str, path: str) -> List[Dependency]:
-    data = json.loads(content)
-    deps = []
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[Tuple[str, str, str, str, str]]:
+        """Yield ``(ecosystem, name, version, scope, manifest_path)`` rows."""
+        return zip(self.ecosystems, self.names, self.versions, self.scopes, self.paths)
+
+    def as_deps(self) -> List[Dep]:
+        return [Dep(*row) for row in self]
+
+    def as_dicts(self) -> List[Dict[str, str]]:
+        return [
+            {"ecosystem": eco, "name": name, "version": version, "scope": scope, "manifest_path": path}
+            for eco, name, version, scope, path in self
+        ]
+
+
+def parse_package_json(content: str, path: str) -> DependencySet:
+    data = json_compat.loads(content)
+    deps = DependencySet()
     for section, scope in (("dependencies", "runtime"), ("devDependencies", "dev")):
         for name, version in data.get(section, {}).items():
-            deps.append(_normalize_dep("npm", name, version, scope, path))
+            deps.append("npm", name, version, scope, path)
     return deps
 
 
-def parse_requirements_txt(content: str, path: str) -> List[Dependency]:
-    deps = []
+def parse_requirements_txt(content: str, path: str) -> DependencySet:
+    deps = DependencySet()
     for line in content.splitlines():
         line = line.strip()
         if not line or line.startswith("#"):
             continue
-        match = re.split(r"(==|>=|<=|~=|!=)", line, maxsplit=1)
-        if len(match) >= 3:
-            name, version = match[0], match[2]
-        else:
-            name, version = line, "*"
-        deps.append(_normalize_dep("pypi", name, version, "runtime", path))
+        name, version = _split_spec(line)
+        deps.append("pypi", name, version, "runtime", path)
     return deps
 
 
-def parse_pyproject_toml(content: str, path: str) -> List[Dependency]:
-    data = tomllib.loads(content)
-    deps = []
+def parse_pyproject_toml(content: str, path: str) -> DependencySet:
+    data = _toml.loads(content)
+    deps = DependencySet()
     project = data.get("project", {})
     for entry in project.get("dependencies", []):
         if isinstance(entry, str):
-            parts = re.split(r"(==|>=|<=|~=|!=)", entry, maxsplit=1)
-            if len(parts) >= 3:
-                name, version = parts[0], parts[2]
-            else:
-                name, version = entry, "*"
-            deps.append(_normalize_dep("pypi", name, version, "runtime", path))
+            name, version = _split_spec(entry)
+            deps.append("pypi", name, version, "runtime", path)
     opt = project.get("optional-dependencies", {})
     for _, items in opt.items():
         for entry in items:
             name = entry.split(" ")[0]
-            deps.append(_normalize_dep("pypi", name, entry, "dev", path))
+            deps.append("pypi", name, entry, "dev", path)
     poetry = data.get("tool", {}).get("poetry", {})
     for section, scope in (("dependencies", "runtime"), ("dev-dependencies", "dev")):
         for name, version in poetry.get(section, {}).items():
             if name == "python":
                 continue
-            deps.append(_normalize_dep("pypi", name, str(version), scope, path))
+            deps.append("pypi", name, str(version), scope, path)
     return deps
 
 
-def parse_pipfile(content: str, path: str) -> List[Dependency]:
+def parse_pipfile(content: str, path: str) -> DependencySet:
     try:
-        data = tomllib.loads(content)
-    except tomllib.TOMLDecodeError:
+        data = _toml.loads(content)
+    except _TOML_ERRORS:
         # Pipfile.lock is JSON; fall back to json loader
-        data = json.loads(content)
-    deps = []
+        data = json_compat.loads(content)
+    deps = DependencySet()
     for section, scope in (("packages", "runtime"), ("dev-packages", "dev")):
         section_data = data.get(section, {}) or data.get("default", {}) if section == "packages" else data.get("develop", {})
         for name, version in section_data.items():
@@ -108,41 +195,61 @@ def parse_pipfile(content: str, path: str) -> List[Dependency]:
                 version_str = version.get("version", "*")
             else:
                 version_str = version if isinstance(version, str) else "*"
-            deps.append(_normalize_dep("pypi", name, version_str, scope, path))
+            deps.append("pypi", name, version_str, scope, path)
     return deps
 
 
-def parse_poetry_lock(content: str, path: str) -> List[Dependency]:
+def parse_poetry_lock(content: str, path: str) -> DependencySet:
     """Parse poetry.lock to capture pinned versions."""
-    data = tomllib.loads(content)
-    deps = []
+    data = _toml.loads(content)
+    deps = DependencySet()
     for pkg in data.get("package", []):
         name = pkg.get("name")
         version = pkg.get("version", "*")
         if not name:
             continue
-        deps.append(_normalize_dep("pypi", name, version, "runtime", path))
+        deps.append("pypi", name, version, "runtime", path)
     return deps
 
 
-def parse_go_mod(content: str, path: str) -> List[Dependency]:
-    deps = []
-    for line in content.splitlines():
-        line = line.strip()
-        if not line or line.startswith("//") or line.startswith("module"):
+def parse_go_mod(content: str, path: str) -> DependencySet:
+    deps = DependencySet()
+    in_block = False
+    for raw in content.splitlines():
+        line = raw.split("//", 1)[0].strip()
+        if not line:
             continue
-        if line.startswith("require"):
-            line = line.replace("require", "", 1).strip().strip("(").strip(")")
+        if in_block:
+            if line.endswith(")"):
+                # `)` closes the block, possibly after the block's last requirement.
+                in_block = False
+                line = line[:-1].rstrip()
+                if not line:
+                    continue
+        elif line.startswith("require"):
+            line = line[len("require"):].lstrip()
+            if line.startswith("("):
+                # `require (` opens a block unless it also closes on this line
+                # (`require ()`, `require (mod v1.0.0)`).
+                line = line[1:].strip()
+                if line.endswith(")"):
+                    line = line[:-1].rstrip()
+                else:
+                    in_block = True
+                if not line:
+                    continue
+        else:
+            # module/go/toolchain directives and replace/exclude/retract lines or blocks
             continue
-        parts = line.split()
+        parts = line.split(None, 2)
         if len(parts) >= 2:
-            deps.append(_normalize_dep("go", parts[0], parts[1], "runtime", path))
+            deps.append("go", parts[0], parts[1], "runtime", path)
     return deps
 
 
-def parse_cargo_toml(content: str, path: str) -> List[Dependency]:
-    data = tomllib.loads(content)
-    deps = []
+def parse_cargo_toml(content: str, path: str) -> DependencySet:
+    data = _toml.loads(content)
+    deps = DependencySet()
     for section, scope in (
         ("dependencies", "runtime"),
         ("dev-dependencies", "dev"),
@@ -150,42 +257,92 @@ def parse_cargo_toml(content: str, path: str) -> List[Dependency]:
     ):
         for name, version in data.get(section, {}).items():
             version_str = version if isinstance(version, str) else "*"
-            deps.append(_normalize_dep("cargo", name, version_str, scope, path))
+            deps.append("cargo", name, version_str, scope, path)
     return deps
 
 
-def parse_pom_xml(content: str, path: str) -> List[Dependency]:
-    deps = []
+def _iter_pom_dependencies(content: str) -> Iterator[ET.Element]:
+    """Stream ``<dependency>`` elements, using lxml's tag-filtered iterparse when available."""
+    tag = f"{_POM_NS}dependency"
+    if LET is not None:
+        # The text was already decoded, so the bytes handed over are UTF-8 whatever the
+        # XML declaration says. Manifests come from untrusted repos: never expand entities.
+        events = LET.iterparse(
+            io.BytesIO(content.encode()),
+            events=("end",),
+            tag=tag,
+            encoding="utf-8",
+            resolve_entities=False,
+            no_network=True,
+        )
+        for _, elem in events:
+            yield elem
+        return
+    # Feeding str (like ET.fromstring) also makes expat ignore the declared encoding.
+    parser = ET.XMLPullParser(events=("end",))
+    for start in range(0, len(content), _XML_FEED_CHUNK):
+        parser.feed(content[start:start + _XML_FEED_CHUNK])
+        for _, elem in parser.read_events():
+            if elem.tag == tag:
+                yield elem
+    parser.close()
+
+
+def parse_pom_xml(content: str, path: str) -> DependencySet:
+    deps = DependencySet()
     try:
-        root = ET.fromstring(content)
-    except ET.ParseError:
-        return deps
-    ns = {"m": "http://maven.apache.org/POM/4.0.0"}
-    for dep in root.findall(".//m:dependency", namespaces=ns):
-        group = dep.findtext("m:groupId", default="", namespaces=ns)
-        artifact = dep.findtext("m:artifactId", default="", namespaces=ns)
-        version = dep.findtext("m:version", default="*", namespaces=ns)
-        scope = dep.findtext("m:scope", default="runtime", namespaces=ns)
-        name = f"{group}:{artifact}" if group else artifact
-        deps.append(_normalize_dep("maven", name, version, scope, path))
+        for dep in _iter_pom_dependencies(content):
+            group = dep.findtext(f"{_POM_NS}groupId", default="")
+            artifact = dep.findtext(f"{_POM_NS}artifactId", default="")
+            version = dep.findtext(f"{_POM_NS}version", default="*")
+            scope = dep.findtext(f"{_POM_NS}scope", default="runtime")
+            name = f"{group}:{artifact}" if group else artifact
+            deps.append("maven", name, version, scope, path)
+            # Free the subtree as we go so large aggregator POMs stay flat in memory.
+            dep.clear()
+    except _XML_ERRORS:
+        return DependencySet()
     return deps
 
 
-def parse_gradle(content: str, path: str) -> List[Dependency]:
-    deps = []
-    pattern = re.compile(r"(implementation|api|compileOnly|runtimeOnly|testImplementation)\s+['\"](.+):(.+):(.+)['\"]")
-    for match in pattern.finditer(content):
-        scope_map = {
-            "implementation": "runtime",
-            "api": "runtime",
-            "compileOnly": "runtime",
-            "runtimeOnly": "runtime",
-            "testImplementation": "test",
-        }
-        scope = scope_map.get(match.group(1), "runtime")
-        name = f"{match.group(2)}:{match.group(3)}"
-        version = match.group(4)
-        deps.append(_normalize_dep("maven", name, version, scope, path))
+def _split_gradle_line(line: str) -> Optional[Tuple[str, str, str, str]]:
+    """Fast path for ``<config> 'group:artifact:version'``; returns None for anything else."""
+    parts = line.split(None, 1)
+    if len(parts) != 2 or parts[0] not in _GRADLE_SCOPES:
+        return None
+    rest = parts[1]
+    quote = rest[0]
+    if quote not in "'\"":
+        return None
+    end = rest.find(quote, 1)
+    if end < 0:
+        return None
+    tail = rest[end + 1:].strip()
+    if tail and not tail.startswith("//"):
+        # More on the line (e.g. a second declaration): leave it to the regex.
+        return None
+    coords = rest[1:end].split(":", 2)
+    if len(coords) != 3 or not all(coords):
+        return None
+    return parts[0], coords[0], coords[1], coords[2]
+
+
+def parse_gradle(content: str, path: str) -> DependencySet:
+    deps = DependencySet()
+    for line in content.splitlines():
+        stripped = line.strip()
+        # Every coordinate has a colon; this skips most of a build script cheaply.
+        if ":" not in stripped:
+            continue
+        found = _split_gradle_line(stripped) if stripped.startswith(_GRADLE_CONFIGS) else None
+        if found is not None:
+            config, group, artifact, version = found
+            deps.append("maven", f"{group}:{artifact}", version, _GRADLE_SCOPES.get(config, "runtime"), path)
+            continue
+        # Anything else (`dependencies { implementation '...' }`, several declarations on
+        # one line, unusual spacing) is scanned for every declaration it contains.
+        for config, group, artifact, version in _GRADLE_RE.findall(stripped):
+            deps.append("maven", f"{group}:{artifact}", version, _GRADLE_SCOPES.get(config, "runtime"), path)
     return deps
 
 
@@ -204,23 +361,64 @@ HANDLERS: Dict[str, Handler] = {
 }
 
 
+# Snapshot of HANDLERS keys for the hot lookup paths; register new handlers in the dict above.
+_HANDLER_NAMES = frozenset(HANDLERS)
+# Every manifest name in one alternation (plus requirements*.txt variants), anchored on the
+# last path component so full paths and bare names are matched by a single search() call.
+_MANIFEST_RE = re.compile(
+    r"(?:^|/)(?:" + "|".join(re.escape(name) for name in sorted(HANDLERS, key=len, reverse=True))
+    + r"|requirements[^/]*\.txt)\Z"
+)
+
+
+def is_manifest_name(name: Optional[str]) -> bool:
+    """Return True when a bare file name is a manifest we know how to parse."""
+    return bool(name) and _MANIFEST_RE.search(name) is not None
+
+
 def detect_manifests(files: Iterable[Dict]) -> List[str]:
     """Return manifest paths discovered in a repo file listing."""
-    manifests = []
-    for f in files:
-        name = f.get("name")
-        if name in HANDLERS or (name and name.startswith("requirements") and name.endswith(".txt")):
-            manifests.append(f["path"])
-    return manifests
+    search = _MANIFEST_RE.search
+    return [f["path"] for f in files if search(f.get("path") or "")]
 
 
-def parse_manifest(path: str, content: str) -> List[Dependency]:
-    """Dispatch to the correct handler based on file name."""
-    handler = HANDLERS.get(Path(path).name)
-    if not handler:
-        return []
+_PARSE_CACHE_SIZE = 4096
+_PARSE_CACHE: "OrderedDict[Tuple[str, bytes], Tuple[Tuple[str, str, str, str], ...]]" = OrderedDict()
+_PARSE_CACHE_LOCK = threading.Lock()
+
+
+def _parse_manifest_cached(name: str, content: str) -> Tuple[Tuple[str, str, str, str], ...]:
+    """Parse ``content`` with the handler for ``name``, memoized on a content digest.
+
+    Identical manifests are common across monorepo folders and sibling repos, so
+    rows are cached without their ``manifest_path`` and re-attached by the caller.
+    Keying on a digest keeps large lockfiles out of the cache.
+    """
+    key = (name, hashlib.blake2b(content.encode(), digest_size=16).digest())
+    with _PARSE_CACHE_LOCK:
+        rows = _PARSE_CACHE.get(key)
+        if rows is not None:
+            _PARSE_CACHE.move_to_end(key)
+            return rows
     try:
-        return handler(content, path)
+        deps = HANDLERS[name](content, "")
     except Exception:
         # Return partial data on parser errors
+        deps = DependencySet()
+    rows = tuple(zip(deps.ecosystems, deps.names, deps.versions, deps.scopes))
+    with _PARSE_CACHE_LOCK:
+        _PARSE_CACHE[key] = rows
+        if len(_PARSE_CACHE) > _PARSE_CACHE_SIZE:
+            _PARSE_CACHE.popitem(last=False)
+    return rows
+
+
+def parse_manifest(path: str, content: str) -> List[Dependency]:
+    """Dispatch to the correct handler based on file name."""
+    name = path.rsplit("/", 1)[-1]
+    if name not in _HANDLER_NAMES:
         return []
+    return [
+        Dep(eco, dep_name, version, scope, path)
+        for eco, dep_name, version, scope in _parse_manifest_cached(name, content)
+    ]
@@ -0,0 +1,68 @@
+"""
+Helpers shared by the shelve-backed caches (GitHub ETags, positive OSV results).
+
+A new store object is built for every scan, and scans run concurrently, so access
+to a given file is serialized by a lock shared per path rather than per instance.
+Stores also call ``maybe_compact`` after writing so the files stay bounded.
+"""
+
+from __future__ import annotations
+
+import dbm
+import os
+import shelve
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+DB_ERRORS = (OSError,) + tuple(dbm.error)
+COMPACT_INTERVAL = 3600  # seconds between compactions of the same file
+
+_LOCKS: Dict[str, threading.Lock] = {}
+_LAST_COMPACT: Dict[str, float] = {}
+_GUARD = threading.Lock()
+
+
+def path_lock(path: str) -> threading.Lock:
+    """The process-wide lock for the shelf at ``path``."""
+    key = os.path.abspath(path)
+    with _GUARD:
+        lock = _LOCKS.get(key)
+        if lock is None:
+            lock = _LOCKS[key] = threading.Lock()
+        return lock
+
+
+def compact(path: str, expires_at: Callable[[Any], float], max_entries: int, now: Optional[float] = None) -> None:
+    """Drop expired entries and keep at most ``max_entries``, longest-lived first.
+
+    The shelf is rewritten (flag ``"n"``) instead of deleting keys in place because
+    the dbm backends do not give back the space of deleted records. Callers must
+    hold ``path_lock(path)``.
+    """
+    now = time.time() if now is None else now
+    with shelve.open(path, flag="r") as db:
+        total = len(db)
+        live = []
+        for key in db.keys():
+            value = db[key]
+            expiry = expires_at(value)
+            if expiry > now:
+                live.append((expiry, key, value))
+    if len(live) == total and total <= max_entries:
+        return
+    live.sort(key=lambda item: item[0], reverse=True)
+    with shelve.open(path, flag="n") as db:
+        for _, key, value in live[:max_entries]:
+            db[key] = value
+
+
+def maybe_compact(path: str, expires_at: Callable[[Any], float], max_entries: int) -> None:
+    """``compact`` at most once per ``COMPACT_INTERVAL`` per file; caller holds the path lock."""
+    now = time.time()
+    key = os.path.abspath(path)
+    with _GUARD:
+        if now - _LAST_COMPACT.get(key, 0.0) < COMPACT_INTERVAL:
+            return
+        _LAST_COMPACT[key] = now
+    compact(path, expires_at, max_entries, now)
@@ -10,31 +10,146 @@ from __future__ import annotations
 import base64
 import datetime as dt
 import os
-from typing import Dict, Iterable, List, Optional
+import shelve
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+from urllib.parse import quote
 
 import requests
+from cachetools import LRUCache
+
+from dependency_parsers import is_manifest_name
+from disk_store import DB_ERRORS, maybe_compact, path_lock
+from http_session import new_session
+from json_compat import loads, response_json
 
 GITHUB_API = "https://api.github.com"
+GITHUB_RAW = "https://raw.githubusercontent.com"
+MAX_WORKERS = 8
+FILES_CACHE_SIZE = 1024
+REPOS_CACHE_SIZE = 4096
+CACHE_DIR = os.getenv("REPOCHKR_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "repochkr"))
+ETAG_CACHE_PATH = os.path.join(CACHE_DIR, "github_etags")
+ETAG_CACHE_MAX_AGE = 30 * 86400  # entries not rewritten for this long are dropped
+ETAG_CACHE_MAX_ENTRIES = 2000
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _etag_expiry(entry: Tuple) -> float:
+    # Entries are (etag, body, stored_at); older two-field entries count as expired.
+    return entry[2] + ETAG_CACHE_MAX_AGE if len(entry) > 2 else 0.0
+
+
+class ETagStore:
+    """Persistent ``key -> (etag, body, stored_at)`` map used for conditional GitHub requests.
+
+    Backed by ``shelve``; the file is opened per access under a lock shared by every
+    store on the same path, since each scan builds its own client. Entries older
+    than ``ETAG_CACHE_MAX_AGE`` and the overflow past ``ETAG_CACHE_MAX_ENTRIES`` are
+    pruned on write. Disk errors degrade to a cache miss.
+    """
+
+    def __init__(self, path: str = ETAG_CACHE_PATH):
+        self.path = path
+        self._lock = path_lock(path)
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes, float]]:
+        with self._lock:
+            try:
+                with shelve.open(self.path, flag="r") as db:
+                    return db.get(key)
+            except DB_ERRORS:
+                return None
+
+    def set(self, key: str, etag: str, body: bytes) -> None:
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with shelve.open(self.path) as db:
+                    db[key] = (etag, body, time.time())
+                maybe_compact(self.path, _etag_expiry, ETAG_CACHE_MAX_ENTRIES)
+            except DB_ERRORS:
+                pass
 
 
 class GitHubClient:
-    def __init__(self, token: Optional[str] = None, session: Optional[requests.Session] = None):
-        self.session = session or requests.Session()
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        etags: Optional[ETagStore] = None,
+    ):
+        self.session = session or new_session()
         self.token = token or os.getenv("GITHUB_TOKEN")
         if self.token:
             self.session.headers.update({"Authorization": f"token {self.token}"})
         self.session.headers.update({"Accept": "application/vnd.github+json"})
-        self.cache: Dict[str, Dict[str, str]] = {"files": {}, "repos": {}}
+        # Bounded so long-running servers scanning many owners do not grow without limit.
+        self.cache: Dict[str, LRUCache] = {"files": LRUCache(FILES_CACHE_SIZE), "repos": LRUCache(REPOS_CACHE_SIZE)}
+        # LRUCache reorders on reads too, so every access goes through this lock.
+        self._cache_lock = threading.Lock()
+        # Set once GitHub reports an exhausted rate limit so queued parallel work bails out early.
+        self._rate_limited = threading.Event()
+        self._rate_limit_reset: Optional[str] = None
+        self.etags = etags or ETagStore()
 
-    def _request(self, url: str, params: Optional[Dict] = None) -> requests.Response:
-        resp = self.session.get(url, params=params or {})
+    def _cache_get(self, bucket: str, key: str):
+        with self._cache_lock:
+            return self.cache[bucket].get(key)
+
+    def _request(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+    ) -> requests.Response:
+        if self._rate_limited.is_set():
+            raise RuntimeError(f"GitHub rate limit exceeded. Resets at {self._rate_limit_reset}.")
+        resp = self.session.get(url, params=params, headers=headers)
         # Minimal backoff on rate limits
         if resp.status_code == 403 and resp.headers.get("X-RateLimit-Remaining") == "0":
             reset = resp.headers.get("X-RateLimit-Reset")
+            self._rate_limit_reset = reset
+            self._rate_limited.set()
             raise RuntimeError(f"GitHub rate limit exceeded. Resets at {reset}.")
         resp.raise_for_status()
         return resp
 
+    def _request_json(self, url: str, params: Optional[Dict] = None, cache_key: Optional[str] = None):
+        """GET and decode JSON, revalidating against a stored ETag when ``cache_key`` is set.
+
+        GitHub answers a matching ``If-None-Match`` with 304, which does not count
+        against the rate limit; the stored body is reused in that case.
+        """
+        cached = self.etags.get(cache_key) if cache_key else None
+        headers = {"If-None-Match": cached[0]} if cached else None
+        resp = self._request(url, params=params, headers=headers)
+        if resp.status_code == 304 and cached:
+            return loads(cached[1])
+        etag = resp.headers.get("ETag")
+        if cache_key and etag:
+            self.etags.set(cache_key, etag, resp.content)
+        return response_json(resp)
+
+    def _run_parallel(self, fn: Callable[[T], R], items: List[T]) -> List[R]:
+        """Map ``fn`` over ``items`` on a thread pool, preserving order.
+
+        The shared session is safe for concurrent GETs. The first failure cancels
+        any work that has not started yet and is re-raised to the caller.
+        """
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+        executor = ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(items)))
+        try:
+            futures = [executor.submit(fn, item) for item in items]
+            return [future.result() for future in futures]
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
     def fetch_repos(
         self,
         owner: str,
@@ -43,11 +158,11 @@ class GitHubClient:
     ) -> List[Dict]:
         """Fetch public repositories for a user/org with optional filters."""
         repos: List[Dict] = []
-        page = 1
+        url = f"{GITHUB_API}/users/{owner}/repos"
+        params = {"per_page": 100, "page": 1, "type": "public", "sort": "updated"}
         while True:
-            url = f"{GITHUB_API}/users/{owner}/repos"
-            resp = self._request(url, params={"per_page": 100, "page": page, "type": "public", "sort": "updated"})
-            batch = resp.json()
+            page = params["page"]
+            batch = self._request_json(url, params=params, cache_key=f"{url}?page={page}")
             if not batch:
                 break
             for repo in batch:
@@ -58,46 +173,202 @@ class GitHubClient:
                     if pushed_at < min_updated:
                         continue
                 repos.append(repo)
-            page += 1
+            params["page"] = page + 1
         return repos
 
+    def _list_directory(self, owner: str, repo: str, path: str) -> List[Dict]:
+        cache_key = f"{owner}/{repo}/{path}"
+        cached = self._cache_get("files", cache_key)
+        if cached is not None:
+            return cached
+        url = f"{GITHUB_API}/repos/{owner}/{repo}/contents/{path}".rstrip("/")
+        try:
+            resp = self._request(url)
+        except requests.HTTPError as exc:
+            if exc.response.status_code == 404:
+                return []
+            raise
+        data = response_json(resp)
+        if not isinstance(data, list):
+            return []
+        with self._cache_lock:
+            self.cache["files"][cache_key] = data
+        return data
+
     def list_repository_files(self, owner: str, repo: str, directories: Iterable[str]) -> List[Dict]:
         """List files in selected directories (root + common config dirs)."""
         files: List[Dict] = []
         for path in directories:
-            cache_key = f"{owner}/{repo}/{path}"
-            if cache_key in self.cache["files"]:
-                files.extend(self.cache["files"][cache_key])
-                continue
-            url = f"{GITHUB_API}/repos/{owner}/{repo}/contents/{path}".rstrip("/")
-            try:
-                resp = self._request(url)
-            except requests.HTTPError as exc:
-                if exc.response.status_code == 404:
-                    continue
-                raise
-            data = resp.json()
-            if isinstance(data, list):
-                files.extend(data)
-                self.cache["files"][cache_key] = data
+            files.extend(self._list_directory(owner, repo, path))
         return files
 
+    def list_repository_files_parallel(self, owner: str, repo: str, directories: Iterable[str]) -> List[Dict]:
+        """Same as ``list_repository_files`` but lists the directories concurrently."""
+        listings = self._run_parallel(lambda path: self._list_directory(owner, repo, path), list(directories))
+        return [entry for listing in listings for entry in listing]
+
     def fetch_file_text(self, owner: str, repo: str, path: str) -> Optional[str]:
-        """Download a file's text content."""
+        """Download a file's text content.
+
+        Revalidated with the stored ETag, so unchanged manifests cost a 304 on
+        repeat scans, also across restarts.
+        """
         cache_key = f"{owner}/{repo}/{path}"
-        if cache_key in self.cache["repos"]:
-            return self.cache["repos"][cache_key]
+        cached = self._cache_get("repos", cache_key)
+        if cached is not None:
+            return cached
         url = f"{GITHUB_API}/repos/{owner}/{repo}/contents/{path}"
+        try:
+            payload = self._request_json(url, cache_key=url)
+        except requests.HTTPError as exc:
+            if exc.response.status_code == 404:
+                return None
+            raise
+        decoded = _decode_content(payload)
+        if decoded is None:
+            return None
+        with self._cache_lock:
+            self.cache["repos"][cache_key] = decoded
+        return decoded
+
+    def fetch_files_text(self, owner: str, repo: str, paths: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Download several files concurrently, keyed by path."""
+        paths = list(paths)
+        texts = self._run_parallel(lambda path: self.fetch_file_text(owner, repo, path), paths)
+        return dict(zip(paths, texts))
+
+    def default_branch(self, owner: str, repo: str, known: Optional[str] = None) -> Optional[str]:
+        """Resolve (and remember) a repo's default branch; ``known`` seeds it from listing metadata."""
+        cache_key = f"__default_branch__{owner}/{repo}"
+        cached = self._cache_get("repos", cache_key)
+        if cached is not None:
+            return cached
+        branch = known or response_json(self._request(f"{GITHUB_API}/repos/{owner}/{repo}")).get("default_branch")
+        if branch:
+            with self._cache_lock:
+                self.cache["repos"][cache_key] = branch
+        return branch
+
+    def fetch_file_text_raw(
+        self, owner: str, repo: str, branch: str, path: str, sha: Optional[str] = None
+    ) -> Optional[str]:
+        """Download a file as plain text from raw.githubusercontent.com.
+
+        Skips the contents API's JSON/base64 wrapping, its 1MB inline limit and the
+        REST rate limit, and revalidates with the stored ETag so repeat scans skip
+        unchanged bodies. When the raw host has nothing (e.g. private repos) the file
+        is fetched through the API token instead: by blob ``sha`` when the caller has
+        it from the git tree, otherwise by path via ``fetch_file_text``.
+        """
+        cache_key = f"{owner}/{repo}/{path}"
+        cached = self._cache_get("repos", cache_key)
+        if cached is not None:
+            return cached
+        if self._rate_limited.is_set():
+            raise RuntimeError(f"GitHub rate limit exceeded. Resets at {self._rate_limit_reset}.")
+        url = f"{GITHUB_RAW}/{owner}/{repo}/{quote(branch)}/{quote(path)}"
+        # Revalidate against the stored copy so unchanged manifests come back as a bodiless 304.
+        stored = self.etags.get(url)
+        resp = self.session.get(url, headers={"If-None-Match": stored[0]} if stored else None)
+        if resp.status_code == 304 and stored:
+            body = stored[1]
+        else:
+            if resp.status_code == 404:
+                return self.fetch_blob(owner, repo, sha) if sha else self.fetch_file_text(owner, repo, path)
+            resp.raise_for_status()
+            body = resp.content
+            etag = resp.headers.get("ETag")
+            if etag:
+                self.etags.set(url, etag, body)
+        text = body.decode("utf-8", errors="ignore")
+        with self._cache_lock:
+            self.cache["repos"][cache_key] = text
+        return text
+
+    def fetch_files_text_raw(
+        self,
+        owner: str,
+        repo: str,
+        branch: str,
+        paths: Iterable[str],
+        shas: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Optional[str]]:
+        """Download several files concurrently from the raw host, keyed by path.
+
+        ``shas`` maps paths to the blob SHAs from ``list_manifest_blobs``; they are
+        only used for files the raw host does not serve.
+        """
+        paths = list(paths)
+        shas = shas or {}
+        texts = self._run_parallel(
+            lambda path: self.fetch_file_text_raw(owner, repo, branch, path, shas.get(path)), paths
+        )
+        return dict(zip(paths, texts))
+
+    def list_manifest_blobs(
+        self,
+        owner: str,
+        repo: str,
+        directories: Optional[Iterable[str]] = None,
+        branch: Optional[str] = None,
+    ) -> Optional[List[Tuple[str, str]]]:
+        """Return ``(path, blob_sha)`` for every manifest in the repo's default branch.
+
+        Uses a single recursive git-tree call instead of one contents call per
+        directory. When ``directories`` is given, only manifests sitting directly in
+        one of them are kept, matching ``list_repository_files``. Returns ``None``
+        when GitHub truncates the tree so callers can fall back to the contents API.
+        """
+        branch = branch or self.default_branch(owner, repo)
+        if not branch:
+            return []
+        url = f"{GITHUB_API}/repos/{owner}/{repo}/git/trees/{branch}"
+        try:
+            resp = self._request(url, params={"recursive": 1})
+        except requests.HTTPError as exc:
+            # 404: unknown branch; 409: empty repository
+            if exc.response.status_code in (404, 409):
+                return []
+            raise
+        data = response_json(resp)
+        if data.get("truncated"):
+            return None
+        wanted = {d.strip("/") for d in directories} if directories is not None else None
+        blobs: List[Tuple[str, str]] = []
+        for entry in data.get("tree", []):
+            if entry.get("type") != "blob":
+                continue
+            parent, _, name = entry["path"].rpartition("/")
+            if wanted is not None and parent not in wanted:
+                continue
+            if is_manifest_name(name):
+                blobs.append((entry["path"], entry["sha"]))
+        return blobs
+
+    def fetch_blob(self, owner: str, repo: str, sha: str) -> Optional[str]:
+        """Download a git blob's text content by SHA."""
+        cache_key = f"{owner}/{repo}@{sha}"
+        cached = self._cache_get("repos", cache_key)
+        if cached is not None:
+            return cached
+        url = f"{GITHUB_API}/repos/{owner}/{repo}/git/blobs/{sha}"
         try:
             resp = self._request(url)
         except requests.HTTPError as exc:
             if exc.response.status_code == 404:
                 return None
             raise
-        payload = resp.json()
-        content = payload.get("content")
-        if not content:
+        decoded = _decode_content(response_json(resp))
+        if decoded is None:
             return None
-        decoded = base64.b64decode(content).decode("utf-8", errors="ignore")
-        self.cache["repos"][cache_key] = decoded
+        with self._cache_lock:
+            self.cache["repos"][cache_key] = decoded
         return decoded
+
+
+def _decode_content(payload: Dict) -> Optional[str]:
+    """Decode the base64 ``content`` field shared by the contents and blobs APIs."""
+    content = payload.get("content")
+    if not content:
+        return None
+    return base64.b64decode(content).decode("utf-8", errors="ignore")
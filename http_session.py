@@ -0,0 +1,41 @@
+"""
+Shared HTTP connection pool.
+
+Each ``GitHubClient`` and ``VulnerabilityLookup`` keeps its own ``requests.Session``
+(sessions carry per-scan state such as the GitHub token), but every session mounts
+the same ``HTTPAdapter``. Keep-alive TCP/TLS connections to GitHub and OSV are
+therefore reused across scans instead of being re-established for each one.
+"""
+
+from __future__ import annotations
+
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Connections kept per host. A scan fans out to SCAN_CONCURRENCY repos x
+# github_client.MAX_WORKERS files (64 by default) and several scans can run at once,
+# so the pool blocks (pool_block) instead of opening extra connections that urllib3
+# would discard: requests past this limit wait for a free keep-alive connection.
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))
+
+# Transient gateway errors only; rate limits (403/429) are handled by the callers.
+_RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(500, 502, 504),
+    allowed_methods=frozenset({"GET", "POST"}),  # OSV POSTs are read-only queries
+    raise_on_status=False,
+)
+# pool_connections is the number of per-host pools kept (GitHub API, raw host, OSV).
+_ADAPTER = HTTPAdapter(pool_connections=8, pool_maxsize=POOL_SIZE, pool_block=True, max_retries=_RETRY)
+
+
+def new_session() -> requests.Session:
+    """Return a fresh session whose connections come from the shared pool."""
+    session = requests.Session()
+    session.mount("https://", _ADAPTER)
+    session.mount("http://", _ADAPTER)
+    return session
@@ -0,0 +1,43 @@
+"""
+JSON encoding/decoding helpers.
+
+Uses orjson when it is installed (noticeably faster on large GitHub tree
+listings, OSV batch replies and report exports) and falls back to the
+standard library.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _default(obj: Any) -> Any:
+    if hasattr(obj, "as_dict"):
+        return obj.as_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode ``obj`` as UTF-8 JSON bytes; dataclass records are written as objects."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default).encode("utf-8")
+
+
+def response_json(resp) -> Any:
+    """Decode an HTTP response body; ``resp`` is any object exposing ``content``/``json()``."""
+    if orjson is not None:
+        return orjson.loads(resp.content)
+    return resp.json()
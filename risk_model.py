@@ -9,6 +9,8 @@ from __future__ import annotations
 
 from typing import Dict, List
 
+from dependency_parsers import Dep
+
 SEVERITY_WEIGHTS = {
     "CRITICAL": 5,
     "HIGH": 4,
@@ -18,30 +20,37 @@ SEVERITY_WEIGHTS = {
 }
 
 
+# Highest-ranked label per weight; LOW wins the tie with UNKNOWN.
+_RANK_LABELS = {rank: label for label, rank in reversed(list(SEVERITY_WEIGHTS.items()))}
+
+
 def severity_rank(severity: str) -> int:
     return SEVERITY_WEIGHTS.get(severity.upper(), 1)
 
 
-def dependency_risk(dep: Dict, vulns: List[Dict]) -> int:
+def vuln_rank(vuln: Dict) -> int:
+    return severity_rank(vuln.get("severity", "LOW"))
+
+
+def dependency_risk(dep: Dep, vulns: List[Dict]) -> int:
     if not vulns:
         return 0
-    weight = max(severity_rank(v.get("severity", "LOW")) for v in vulns)
-    scope_boost = 1 if dep.get("scope") == "runtime" else 0
+    weight = max(vuln_rank(v) for v in vulns)
+    scope_boost = 1 if dep.scope == "runtime" else 0
     return weight + scope_boost
 
 
 def repo_risk(deps_with_vulns: List[Dict]) -> Dict[str, int]:
     score = 0
-    highest = "LOW"
+    highest_rank = SEVERITY_WEIGHTS["LOW"]
     vuln_count = 0
     for item in deps_with_vulns:
         vulns = item.get("vulnerabilities", [])
         if not vulns:
             continue
         vuln_count += 1
-        dep_score = dependency_risk(item["dependency"], vulns)
-        score += dep_score
-        sev = max((v.get("severity", "LOW") for v in vulns), key=severity_rank)
-        if severity_rank(sev) > severity_rank(highest):
-            highest = sev
-    return {"risk_score": score, "highest_severity": highest, "vulnerable_dependencies": vuln_count}
+        rank = max(vuln_rank(v) for v in vulns)
+        score += rank + (1 if item["dependency"].scope == "runtime" else 0)
+        if rank > highest_rank:
+            highest_rank = rank
+    return {"risk_score": score, "highest_severity": _RANK_LABELS[highest_rank], "vulnerable_dependencies": vuln_count}
@@ -0,0 +1,54 @@
+"""
+Build the OSV vulnerable-package Bloom filter used by ``vuln_bloom``.
+
+Downloads each ecosystem's ``all.zip`` export from the public OSV bucket and
+records every affected package name. Run weekly (e.g. from cron):
+
+    python scripts/build_vuln_bloom.py [output-path]
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import sys
+import zipfile
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from vuln_bloom import BLOOM_PATH, OSV_ECOSYSTEMS, BloomFilter, package_key  # noqa: E402
+
+OSV_BUCKET = "https://osv-vulnerabilities.storage.googleapis.com"
+
+
+def collect_keys() -> set:
+    keys = set()
+    for label, osv_name in OSV_ECOSYSTEMS.items():
+        resp = requests.get(f"{OSV_BUCKET}/{osv_name}/all.zip", timeout=300)
+        resp.raise_for_status()
+        with zipfile.ZipFile(io.BytesIO(resp.content)) as archive:
+            for member in archive.namelist():
+                record = json.loads(archive.read(member))
+                for aff in record.get("affected", []):
+                    name = aff.get("package", {}).get("name")
+                    if name:
+                        keys.add(package_key(label, name))
+        print(f"{osv_name}: {len(keys)} packages so far")
+    return keys
+
+
+def main() -> None:
+    path = sys.argv[1] if len(sys.argv) > 1 else BLOOM_PATH
+    keys = collect_keys()
+    bloom = BloomFilter.for_capacity(len(keys))
+    for key in keys:
+        bloom.add(key)
+    bloom.save(path)
+    print(f"Wrote {len(keys)} packages ({len(bloom.bits)} bytes) to {path}")
+
+
+if __name__ == "__main__":
+    main()
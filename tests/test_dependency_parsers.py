@@ -0,0 +1,147 @@
+import pytest
+
+import dependency_parsers
+from dependency_parsers import _split_spec, parse_go_mod, parse_gradle, parse_pom_xml, parse_requirements_txt
+
+
+def _rows(deps):
+    return [(name, version, scope) for _, name, version, scope, _ in deps]
+
+
+GO_MOD = """module example.com/app
+
+go 1.21
+
+toolchain go1.21.3
+
+require github.com/pkg/errors v0.9.1
+
+require (
+\tgolang.org/x/net v0.17.0
+\tgolang.org/x/text v0.13.0 // indirect
+)
+
+require ( github.com/google/uuid v1.4.0
+)
+
+require (
+\tgithub.com/spf13/cobra v1.8.0
+) // end of block
+
+replace example.com/old => example.com/new v1.0.0
+
+require ()
+
+replace example.com/empty => example.com/new v1.0.0
+
+require (github.com/stretchr/testify v1.8.4)
+
+replace github.com/pkg/errors => github.com/fork/errors v0.9.2
+
+replace (
+\tgolang.org/x/net => golang.org/x/net v0.18.0
+)
+
+exclude golang.org/x/text v0.12.0
+"""
+
+
+def test_go_mod_requirements_only():
+    assert _rows(parse_go_mod(GO_MOD, "go.mod")) == [
+        ("github.com/pkg/errors", "v0.9.1", "runtime"),
+        ("golang.org/x/net", "v0.17.0", "runtime"),
+        ("golang.org/x/text", "v0.13.0", "runtime"),
+        ("github.com/google/uuid", "v1.4.0", "runtime"),
+        ("github.com/spf13/cobra", "v1.8.0", "runtime"),
+        ("github.com/stretchr/testify", "v1.8.4", "runtime"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "spec, expected",
+    [
+        ("requests==2.31.0", ("requests", "2.31.0")),
+        ("flask >= 2.0", ("flask", "2.0")),
+        ("django~=4.2", ("django", "4.2")),
+        ("foo!=1.0", ("foo", "1.0")),
+        ("bar<=3", ("bar", "3")),
+        ("numpy", ("numpy", "*")),
+        ("pkg>1.0", ("pkg>1.0", "*")),
+        ("x===1", ("x", "=1")),
+    ],
+)
+def test_split_spec(spec, expected):
+    assert _split_spec(spec) == expected
+
+
+def test_requirements_txt():
+    content = "# pinned\nrequests==2.31.0\nflask >= 2.0\n\nnumpy\n"
+    assert _rows(parse_requirements_txt(content, "requirements.txt")) == [
+        ("requests", "2.31.0", "runtime"),
+        ("flask", "2.0", "runtime"),
+        ("numpy", "*", "runtime"),
+    ]
+
+
+def test_gradle_one_declaration_per_line():
+    content = """
+dependencies {
+    implementation 'com.google.guava:guava:32.1.2-jre'
+    testImplementation "junit:junit:4.13.2" // unit tests
+    api   'org.slf4j:slf4j-api:2.0.9'
+}
+"""
+    assert _rows(parse_gradle(content, "build.gradle")) == [
+        ("com.google.guava:guava", "32.1.2-jre", "runtime"),
+        ("junit:junit", "4.13.2", "test"),
+        ("org.slf4j:slf4j-api", "2.0.9", "runtime"),
+    ]
+
+
+def test_gradle_declarations_not_at_line_start():
+    content = (
+        "dependencies { implementation 'one:line:1.0' }\n"
+        "dependencies { api 'a:b:1'; testImplementation 'c:d:2' }\n"
+        "implementation 'e:f:3' compileOnly 'g:h:4'\n"
+    )
+    assert _rows(parse_gradle(content, "build.gradle")) == [
+        ("one:line", "1.0", "runtime"),
+        ("a:b", "1", "runtime"),
+        ("c:d", "2", "test"),
+        ("e:f", "3", "runtime"),
+        ("g:h", "4", "runtime"),
+    ]
+
+
+def test_gradle_ignores_non_coordinates():
+    content = "plugins { id 'java' }\nimplementation project(':core')\nurl 'https://repo.example/m2'\n"
+    assert len(parse_gradle(content, "build.gradle")) == 0
+
+
+POM_LATIN1 = """<?xml version="1.0" encoding="ISO-8859-1"?>
+<project xmlns="http://maven.apache.org/POM/4.0.0">
+  <dependencies>
+    <dependency>
+      <groupId>org.example</groupId>
+      <artifactId>b\u00e4r</artifactId>
+      <version>\u00e43</version>
+      <scope>test</scope>
+    </dependency>
+    <dependency>
+      <artifactId>plain</artifactId>
+    </dependency>
+  </dependencies>
+</project>
+"""
+
+
+@pytest.mark.parametrize("use_lxml", [True, False])
+def test_pom_text_is_not_re_decoded_with_declared_encoding(monkeypatch, use_lxml):
+    if use_lxml:
+        pytest.importorskip("lxml")
+    else:
+        monkeypatch.setattr(dependency_parsers, "LET", None)
+    assert _rows(parse_pom_xml(POM_LATIN1, "pom.xml")) == [
+        ("org.example:b\u00e4r", "\u00e43", "test"),
+        ("plain", "*", "runtime"),
+    ]
@@ -0,0 +1,44 @@
+import shelve
+import threading
+
+from disk_store import compact
+from github_client import ETagStore
+from vuln_lookup import PositiveResultStore
+
+
+def test_concurrent_stores_on_one_path_keep_every_write(tmp_path):
+    path = str(tmp_path / "osv_positive")
+    stores = [PositiveResultStore(path) for _ in range(4)]
+
+    def write(idx, store):
+        for i in range(150):
+            store.set_many({("pypi", f"pkg{idx}-{i}", "1.0"): [{"id": f"X-{idx}-{i}"}]})
+
+    threads = [threading.Thread(target=write, args=(idx, store)) for idx, store in enumerate(stores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    keys = [("pypi", f"pkg{idx}-{i}", "1.0") for idx in range(4) for i in range(150)]
+    assert len(PositiveResultStore(path).get_many(keys)) == 600
+
+
+def test_compact_drops_expired_and_caps_size(tmp_path):
+    path = str(tmp_path / "cache")
+    with shelve.open(path) as db:
+        db["expired"] = (5.0, "x")
+        for i in range(10):
+            db[f"live{i}"] = (100.0 + i, "x")
+
+    compact(path, lambda entry: entry[0], max_entries=3, now=10.0)
+
+    with shelve.open(path, flag="r") as db:
+        assert sorted(db.keys()) == ["live7", "live8", "live9"]
+
+
+def test_etag_store_round_trip(tmp_path):
+    store = ETagStore(str(tmp_path / "etags"))
+    store.set("k", '"abc"', b"body")
+    etag, body, _ = ETagStore(store.path).get("k")
+    assert (etag, body) == ('"abc"', b"body")
@@ -0,0 +1,76 @@
+import base64
+import json
+
+from github_client import GITHUB_API, GITHUB_RAW, ETagStore, GitHubClient
+
+
+class _Resp:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise AssertionError(f"unexpected HTTP {self.status_code}")
+
+
+class _Session:
+    """Serves one body with ETag "v1" and answers a matching If-None-Match with 304.
+
+    URLs starting with ``missing`` get a 404.
+    """
+
+    def __init__(self, body, missing=None):
+        self.headers = {}
+        self.body = body
+        self.missing = missing
+        self.calls = []
+
+    def get(self, url, params=None, headers=None):
+        self.calls.append((url, headers))
+        if self.missing and url.startswith(self.missing):
+            return _Resp(404)
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return _Resp(304)
+        return _Resp(200, self.body(url), {"ETag": '"v1"'})
+
+
+def test_raw_fetch_revalidates_with_stored_etag(tmp_path):
+    etags = ETagStore(str(tmp_path / "etags"))
+    session = _Session(lambda url: b"flask==2.0\n")
+
+    first = GitHubClient(session=session, etags=etags).fetch_file_text_raw("o", "r", "main", "requirements.txt")
+    # A new client has a cold in-memory cache, like the next scan.
+    second = GitHubClient(session=session, etags=etags).fetch_file_text_raw("o", "r", "main", "requirements.txt")
+
+    assert first == second == "flask==2.0\n"
+    assert session.calls == [
+        (f"{GITHUB_RAW}/o/r/main/requirements.txt", None),
+        (f"{GITHUB_RAW}/o/r/main/requirements.txt", {"If-None-Match": '"v1"'}),
+    ]
+
+
+def test_contents_fetch_revalidates_with_stored_etag(tmp_path):
+    etags = ETagStore(str(tmp_path / "etags"))
+    payload = json.dumps({"content": base64.b64encode(b"left-pad==1.0\n").decode()}).encode()
+    session = _Session(lambda url: payload)
+
+    for _ in range(2):
+        text = GitHubClient(session=session, etags=etags).fetch_file_text("o", "r", "requirements.txt")
+        assert text == "left-pad==1.0\n"
+    assert session.calls[1][1] == {"If-None-Match": '"v1"'}
+
+
+def test_raw_miss_falls_back_to_blob_by_sha(tmp_path):
+    payload = json.dumps({"content": base64.b64encode(b"serde = \"1\"\n").decode()}).encode()
+    session = _Session(lambda url: payload, missing=GITHUB_RAW)
+
+    client = GitHubClient(session=session, etags=ETagStore(str(tmp_path / "etags")))
+    texts = client.fetch_files_text_raw("o", "r", "main", ["Cargo.toml"], {"Cargo.toml": "abc123"})
+
+    assert texts == {"Cargo.toml": "serde = \"1\"\n"}
+    assert session.calls[-1][0] == f"{GITHUB_API}/repos/o/r/git/blobs/abc123"
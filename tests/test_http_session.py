@@ -0,0 +1,48 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import http_session
+
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        time.sleep(0.02)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+class _Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_fan_out_beyond_pool_size_reuses_connections():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+    collect = _Collect()
+    logger = logging.getLogger("urllib3.connectionpool")
+    logger.addHandler(collect)
+    try:
+        sessions = [http_session.new_session() for _ in range(4)]
+        with ThreadPoolExecutor(max_workers=http_session.POOL_SIZE * 3) as pool:
+            codes = list(pool.map(lambda i: sessions[i % 4].get(url).status_code, range(http_session.POOL_SIZE * 6)))
+    finally:
+        logger.removeHandler(collect)
+        server.shutdown()
+    assert codes == [200] * (http_session.POOL_SIZE * 6)
+    assert not any("pool is full" in message for message in collect.messages)
@@ -0,0 +1,46 @@
+import struct
+
+import pytest
+
+from vuln_bloom import BloomFilter, canonical_name, covers, load_default, package_key
+
+
+@pytest.mark.parametrize(
+    "ecosystem, manifest_name, osv_name",
+    [
+        ("pypi", "python_dateutil", "python-dateutil"),
+        ("pypi", "python.dateutil", "python-dateutil"),
+        ("pypi", "Python__DateUtil", "python-dateutil"),
+        ("cargo", "serde_json", "serde-json"),
+        ("npm", "Lodash", "lodash"),
+    ],
+)
+def test_manifest_spelling_matches_osv_spelling(ecosystem, manifest_name, osv_name):
+    bloom = BloomFilter.for_capacity(10)
+    bloom.add(package_key(ecosystem, osv_name))
+    assert package_key(ecosystem, manifest_name) in bloom
+
+
+def test_canonical_name_leaves_other_ecosystems_separators_alone():
+    assert canonical_name("maven", "org.Example:my_lib") == "org.example:my_lib"
+    assert canonical_name("go", "github.com/Foo/bar_baz") == "github.com/foo/bar_baz"
+
+
+def test_covers_only_filtered_ecosystems():
+    assert covers("PyPI")
+    assert not covers("rubygems")
+
+
+def test_round_trip_and_stale_format_rejected(tmp_path):
+    bloom = BloomFilter.for_capacity(10)
+    bloom.add(package_key("pypi", "requests"))
+    path = str(tmp_path / "filter.bloom")
+    bloom.save(path)
+    loaded = load_default(path)
+    assert loaded is not None and package_key("pypi", "requests") in loaded
+
+    # Filters written with the previous key scheme must not be trusted.
+    with open(path, "wb") as fh:
+        fh.write(struct.pack("<8sQI", b"RCBLOOM1", bloom.num_bits, bloom.num_hashes))
+        fh.write(bloom.bits)
+    assert load_default(path) is None
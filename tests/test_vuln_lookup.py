@@ -0,0 +1,131 @@
+import json
+
+import vuln_lookup
+from vuln_bloom import BloomFilter, package_key
+from vuln_lookup import OSV_BATCH_SIZE, PositiveResultStore, VulnerabilityLookup
+
+
+def _lookup(*packages):
+    bloom = BloomFilter.for_capacity(10)
+    for ecosystem, name in packages:
+        bloom.add(package_key(ecosystem, name))
+    return VulnerabilityLookup(bloom=bloom)
+
+
+def test_bloom_filter_normalizes_pypi_names():
+    lookup = _lookup(("pypi", "python-dateutil"))
+    assert not lookup._never_vulnerable("pypi", "python_dateutil")
+    assert lookup._never_vulnerable("pypi", "left-pad-for-python")
+
+
+def test_bloom_filter_ignored_for_uncovered_ecosystems():
+    lookup = _lookup()
+    assert not lookup._never_vulnerable("rubygems", "rails")
+
+
+def test_parsed_vuln_has_only_public_fields():
+    record = _lookup()._parse_vuln({"id": "GHSA-1", "summary": "bad", "severity": [{"type": "HIGH", "score": "7.5"}]})
+    assert sorted(record) == [
+        "affected_range", "cvss_score", "fixed_versions", "id", "reference_url", "severity", "summary",
+    ]
+
+
+def _record(vuln_id):
+    return {"id": vuln_id, "summary": f"{vuln_id} summary", "affected": [], "severity": [{"type": "HIGH", "score": "7.5"}]}
+
+
+class _Resp:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.content = json.dumps(body or {}).encode()
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise AssertionError(f"unexpected HTTP {self.status_code}")
+
+
+class _OSV:
+    """Fake OSV: querybatch answers with bare ids, /vulns/{id} and /query with full records."""
+
+    def __init__(self, advisories, reject_batches=False):
+        self.advisories = advisories  # package name -> advisory ids
+        self.reject_batches = reject_batches
+        self.batches = []
+        self.queries = []
+        self.details = []
+
+    def _ids(self, query):
+        return self.advisories.get(query["package"]["name"].lower(), [])
+
+    def post(self, url, json=None, timeout=None):
+        if url.endswith("/querybatch"):
+            self.batches.append(json["queries"])
+            if self.reject_batches:
+                return _Resp(400)
+            results = [
+                {"vulns": [{"id": i, "modified": "2024-01-01T00:00:00Z"} for i in self._ids(q)]}
+                for q in json["queries"]
+            ]
+            return _Resp(200, {"results": results})
+        self.queries.append(json)
+        return _Resp(200, {"vulns": [_record(i) for i in self._ids(json)]})
+
+    def get(self, url, timeout=None):
+        vuln_id = url.rsplit("/", 1)[-1]
+        self.details.append(vuln_id)
+        return _Resp(200, _record(vuln_id))
+
+
+def _offline_lookup(tmp_path, osv):
+    # The process-wide positive cache would leak results between tests.
+    vuln_lookup._POSITIVE_CACHE.clear()
+    lookup = VulnerabilityLookup(store=PositiveResultStore(str(tmp_path / "osv_positive")))
+    lookup.bloom = None
+    lookup.session = osv
+    return lookup
+
+
+def test_lookup_batch_dedups_and_keeps_query_order(tmp_path):
+    osv = _OSV({"flask": ["GHSA-1"]})
+    queries = [
+        ("PyPI", "Flask", "2.0.0"),
+        ("npm", "left-pad", "*"),
+        ("pypi", "flask", "2.0.0"),
+        ("npm", "lodash", "4.17.21"),
+    ]
+    results = _offline_lookup(tmp_path, osv).lookup_batch(queries)
+
+    assert len(osv.batches) == 1 and len(osv.batches[0]) == 2
+    assert [[v["id"] for v in vulns] for vulns in results] == [["GHSA-1"], [], ["GHSA-1"], []]
+    # Batch replies carry ids only; each full record is fetched once.
+    assert osv.details == ["GHSA-1"]
+    assert results[0][0]["summary"] == "GHSA-1 summary"
+
+
+def test_lookup_batch_chunks_queries(tmp_path):
+    osv = _OSV({})
+    queries = [("npm", f"pkg{i}", "1.0.0") for i in range(OSV_BATCH_SIZE + 1)]
+    _offline_lookup(tmp_path, osv).lookup_batch(queries)
+    assert [len(batch) for batch in osv.batches] == [OSV_BATCH_SIZE, 1]
+
+
+def test_lookup_batch_falls_back_to_single_queries_on_400(tmp_path):
+    osv = _OSV({"requests": ["PYSEC-1"]}, reject_batches=True)
+    results = _offline_lookup(tmp_path, osv).lookup_batch([("PyPI", "requests", "2.0.0"), ("PyPI", "bad name", "x")])
+    assert len(osv.batches) == 1
+    assert [q["package"]["name"] for q in osv.queries] == ["requests", "bad name"]
+    assert [[v["id"] for v in vulns] for vulns in results] == [["PYSEC-1"], []]
+
+
+def test_lookup_batch_persists_only_positive_results(tmp_path):
+    queries = [("PyPI", "requests", "2.0.0"), ("npm", "lodash", "4.17.21")]
+    _offline_lookup(tmp_path, _OSV({"requests": ["PYSEC-1"]})).lookup_batch(queries)
+
+    osv = _OSV({})
+    results = _offline_lookup(tmp_path, osv).lookup_batch(queries)
+    # The hit comes back from disk; the miss is asked again rather than trusted as clean.
+    assert [[q["package"]["name"] for q in batch] for batch in osv.batches] == [["lodash"]]
+    assert [[v["id"] for v in vulns] for vulns in results] == [["PYSEC-1"], []]
@@ -0,0 +1,91 @@
+import re
+
+import pytest
+from cachetools import TTLCache
+
+pytest.importorskip("fasthtml")
+pytest.importorskip("httpx")
+
+from starlette.testclient import TestClient  # noqa: E402
+
+import webapp  # noqa: E402
+
+
+def _repo(name):
+    return {
+        "name": name,
+        "html_url": f"https://github.com/o/{name}",
+        "pushed_at": "2024-01-01T00:00:00Z",
+        "meta": {"full_name": f"o/{name}"},
+        "dependencies": [],
+        "vulnerable_dependencies": 0,
+        "highest_severity": "NONE",
+        "risk_score": 0,
+    }
+
+
+@pytest.fixture
+def client():
+    return TestClient(webapp.app)
+
+
+def test_layout_script_url_is_served(client):
+    page = client.get("/")
+    assert page.status_code == 200
+    src = re.search(r'<script src="(/assets/app-[0-9a-f]+)"', page.text).group(1)
+    assert src == webapp._APP_JS_URL
+
+    resp = client.get(src)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/javascript")
+    assert "immutable" in resp.headers["cache-control"]
+    assert resp.content == webapp._APP_JS_BYTES
+
+
+def test_repo_detail_reachable_for_names_with_static_extensions(client):
+    repo = _repo("reveal.js")
+    scan_id = webapp._store_scan("o", [repo])
+    detail_url = re.search(r'hx-get="([^"]+)"', webapp._repo_row_html(repo, scan_id)).group(1)
+
+    resp = client.get(detail_url.replace("&amp;", "&"))
+    assert resp.status_code == 200
+    assert "o/reveal.js" in resp.text
+    assert "Dependency details" in resp.text
+
+
+def test_export_json_answers_304_for_matching_etag(client):
+    scan_id = webapp._store_scan("o", [_repo("lib")])
+    first = client.get(f"/export/json?id={scan_id}")
+    assert first.status_code == 200
+    assert first.json()["owner"] == "o"
+    etag = first.headers["etag"]
+
+    again = client.get(f"/export/json?id={scan_id}", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+    # The Markdown export has its own validator.
+    assert client.get(f"/export/md?id={scan_id}", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_identical_scans_reuse_results(client, monkeypatch):
+    calls = []
+
+    def fake_scan_owner(owner, include_forks, min_updated, token=""):
+        calls.append((owner, token))
+        return [_repo("lib")]
+
+    monkeypatch.setattr(webapp, "scan_owner", fake_scan_owner)
+    monkeypatch.setattr(webapp, "_SCAN_RESULT_CACHE", TTLCache(maxsize=4, ttl=60))
+
+    pages = [client.post("/scan", data={"owner": owner}) for owner in ("octo", "Octo")]
+    assert all(page.status_code == 200 for page in pages)
+    assert calls == [("octo", "")]
+    assert webapp.progress_snapshot()["message"] == "Complete (cached)"
+    # Each render still gets its own scan id for the export links.
+    ids = [re.search(r"/export/json\?id=([\w-]+)", page.text).group(1) for page in pages]
+    assert ids[0] != ids[1]
+
+    client.post("/scan", data={"owner": "octo", "token": "ghp_other"})
+    assert calls == [("octo", ""), ("octo", "ghp_other")]
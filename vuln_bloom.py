@@ -0,0 +1,115 @@
+"""
+Bloom filter of packages that have ever appeared in an OSV advisory.
+
+Most dependencies have no advisories at all, so checking this filter first lets
+``VulnerabilityLookup`` skip the OSV round trip for them. A Bloom filter never
+reports a false "absent", so a fresh filter cannot hide a vulnerability; a stale
+one can, which is why filters older than ``MAX_AGE_DAYS`` are ignored. Rebuild it
+with ``python scripts/build_vuln_bloom.py`` (weekly is a good cadence).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import re
+import struct
+import time
+from typing import Iterable, Optional
+
+CACHE_DIR = os.getenv("REPOCHKR_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "repochkr"))
+BLOOM_PATH = os.getenv("OSV_BLOOM_PATH", os.path.join(CACHE_DIR, "vuln_packages.bloom"))
+MAX_AGE_DAYS = 14
+
+# Our ecosystem labels (see dependency_parsers) -> OSV ecosystem names.
+OSV_ECOSYSTEMS = {
+    "npm": "npm",
+    "pypi": "PyPI",
+    "go": "Go",
+    "cargo": "crates.io",
+    "maven": "Maven",
+}
+
+# Bumped whenever package_key changes, so filters built with older keys are rejected.
+_MAGIC = b"RCBLOOM2"
+_HEADER = struct.Struct("<8sQI")
+_PYPI_SEPARATORS = re.compile(r"[-_.]+")
+
+
+def canonical_name(ecosystem: str, name: str) -> str:
+    """Registry-equivalent spelling of ``name``, so manifest and OSV spellings share a key.
+
+    PyPI follows PEP 503 (runs of ``-``, ``_`` and ``.`` are one separator) and
+    crates.io treats ``-`` and ``_`` alike. Other ecosystems are only lowercased,
+    which can merge distinct names but never splits equal ones.
+    """
+    ecosystem = ecosystem.lower()
+    if ecosystem == "pypi":
+        return _PYPI_SEPARATORS.sub("-", name).lower()
+    if ecosystem == "cargo":
+        return name.replace("_", "-").lower()
+    return name.lower()
+
+
+def covers(ecosystem: str) -> bool:
+    """True for ecosystems the filter is built from; others must always be queried."""
+    return ecosystem.lower() in OSV_ECOSYSTEMS
+
+
+def package_key(ecosystem: str, name: str) -> bytes:
+    return f"{ecosystem.lower()}\0{canonical_name(ecosystem, name)}".encode()
+
+
+class BloomFilter:
+    def __init__(self, num_bits: int, num_hashes: int, bits: Optional[bytes] = None):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bytearray(bits) if bits is not None else bytearray((num_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float = 0.001) -> "BloomFilter":
+        capacity = max(capacity, 1)
+        num_bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return cls(num_bits, num_hashes)
+
+    def _positions(self, key: bytes) -> Iterable[int]:
+        # Kirsch-Mitzenmacher double hashing over one 128-bit digest.
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: bytes) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(_HEADER.pack(_MAGIC, self.num_bits, self.num_hashes))
+            fh.write(self.bits)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        with open(path, "rb") as fh:
+            magic, num_bits, num_hashes = _HEADER.unpack(fh.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not a vuln package bloom filter")
+            return cls(num_bits, num_hashes, fh.read())
+
+
+def load_default(path: str = BLOOM_PATH, max_age_days: int = MAX_AGE_DAYS) -> Optional[BloomFilter]:
+    """Load the shipped/refreshed filter, or ``None`` when it is missing, corrupt or stale."""
+    try:
+        if time.time() - os.path.getmtime(path) > max_age_days * 86400:
+            return None
+        return BloomFilter.load(path)
+    except (OSError, ValueError, struct.error):
+        return None
@@ -2,95 +2,348 @@
 Vulnerability lookup module using an OSV-style API.
 
 The lookup keeps an in-memory cache for the duration of the process to avoid
-re-querying the same (ecosystem, package, version) tuples.
+re-querying the same (ecosystem, package, version) tuples. Non-empty results are
+additionally kept for ``OSV_CACHE_TTL`` seconds across scans, in memory and on
+disk; empty results are never persisted so a new advisory cannot be masked by a
+stale "no vulnerabilities" entry.
 """
 
 from __future__ import annotations
 
 import os
+import shelve
+import threading
 import time
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import requests
+from cachetools import LRUCache, TTLCache
+
+from dependency_parsers import Dep, DependencySet
+from disk_store import DB_ERRORS, maybe_compact, path_lock
+from http_session import new_session
+from json_compat import response_json
+from vuln_bloom import CACHE_DIR, BloomFilter, covers, load_default, package_key
 
 OSV_API = os.getenv("OSV_API", "https://api.osv.dev/v1/query")
+OSV_BATCH_SIZE = 1000  # querybatch accepts at most 1000 queries per request
+CACHE_SIZE = 8192
+VULN_DETAILS_CACHE_SIZE = 4096
+DETAIL_WORKERS = 8
+OSV_CACHE_SCHEMA = 2  # bump whenever the VulnRecord shape changes
+OSV_CACHE_TTL = 24 * 3600
+OSV_CACHE_PATH = os.path.join(CACHE_DIR, "osv_positive")
+OSV_CACHE_MAX_ENTRIES = 20_000
 
 Severity = str
 VulnRecord = Dict[str, object]
+# Shared "no vulnerabilities" result; callers must treat lookup results as read-only.
+_EMPTY: List[VulnRecord] = []
+Dependencies = Union[DependencySet, List[Dep]]
+VulnKey = Tuple[str, str, str]
+
+# Positive results shared by every VulnerabilityLookup in the process (one is built per scan).
+_POSITIVE_CACHE: TTLCache = TTLCache(maxsize=100_000, ttl=OSV_CACHE_TTL)
+_POSITIVE_LOCK = threading.Lock()
+
+
+def _dep_triples(deps: Dependencies) -> Iterator[Tuple[str, str, str]]:
+    """Yield ``(ecosystem, name, version)`` from either a ``DependencySet`` or ``Dep`` rows."""
+    if isinstance(deps, DependencySet):
+        return zip(deps.ecosystems, deps.names, deps.versions)
+    return ((dep.ecosystem, dep.name, dep.version) for dep in deps)
+
+
+class PositiveResultStore:
+    """On-disk cache of non-empty OSV results with a TTL.
+
+    Backed by ``shelve`` like the GitHub ETag store, with the same per-path lock;
+    entries are keyed by the schema version plus the lowercased (ecosystem, name,
+    version) tuple. Expired entries and the overflow past ``OSV_CACHE_MAX_ENTRIES``
+    are pruned on write. Disk errors degrade to a cache miss.
+    """
+
+    def __init__(self, path: str = OSV_CACHE_PATH, ttl: int = OSV_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = path_lock(path)
+
+    @staticmethod
+    def _key(key: VulnKey) -> str:
+        return f"{OSV_CACHE_SCHEMA}|{key[0]}|{key[1]}|{key[2]}"
+
+    def get_many(self, keys: Iterable[VulnKey]) -> Dict[VulnKey, List[VulnRecord]]:
+        found: Dict[VulnKey, List[VulnRecord]] = {}
+        now = time.time()
+        with self._lock:
+            try:
+                with shelve.open(self.path, flag="r") as db:
+                    for key in keys:
+                        entry = db.get(self._key(key))
+                        if entry and entry[0] > now:
+                            found[key] = entry[1]
+            except DB_ERRORS:
+                pass
+        return found
+
+    def set_many(self, items: Dict[VulnKey, List[VulnRecord]]) -> None:
+        expires = time.time() + self.ttl
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with shelve.open(self.path) as db:
+                    for key, vulns in items.items():
+                        db[self._key(key)] = (expires, vulns)
+                maybe_compact(self.path, lambda entry: entry[0], OSV_CACHE_MAX_ENTRIES)
+            except DB_ERRORS:
+                pass
 
 
 class VulnerabilityLookup:
-    def __init__(self, api_url: str = OSV_API):
+    def __init__(
+        self,
+        api_url: str = OSV_API,
+        bloom: Optional[BloomFilter] = None,
+        store: Optional[PositiveResultStore] = None,
+    ):
         self.api_url = api_url
-        self.cache: Dict[tuple, List[VulnRecord]] = {}
-        self.session = requests.Session()
+        # Packages missing from the filter have never had an advisory; None disables the check.
+        self.bloom = bloom if bloom is not None else load_default()
+        # Sibling endpoints live next to /v1/query, so derive them from the configured URL.
+        base = api_url.rsplit("/", 1)[0]
+        self.batch_url = f"{base}/querybatch"
+        self.vulns_url = f"{base}/vulns"
+        self.cache: LRUCache = LRUCache(CACHE_SIZE)
+        self._vuln_details: LRUCache = LRUCache(VULN_DETAILS_CACHE_SIZE)
+        # Lookups may run from several scan threads; LRUCache is not thread-safe.
+        self._cache_lock = threading.Lock()
+        self.store = store or PositiveResultStore()
+        self.session = new_session()
 
-    def lookup(self, ecosystem: str, name: str, version: str) -> List[VulnRecord]:
-        key = (ecosystem.lower(), name.lower(), version)
-        if key in self.cache:
-            return self.cache[key]
-        if not name or not version or version == "*":
-            self.cache[key] = []
-            return []
-        payload = {"version": version, "package": {"ecosystem": ecosystem, "name": name}}
+    def _cache_get(self, cache: LRUCache, key):
+        with self._cache_lock:
+            return cache.get(key)
+
+    def _cache_set(self, cache: LRUCache, key, value) -> None:
+        with self._cache_lock:
+            cache[key] = value
+
+    def _load_positive(self, keys: Iterable[VulnKey]) -> Dict[VulnKey, List[VulnRecord]]:
+        """Previously seen non-empty results from the process-wide and on-disk caches."""
+        found: Dict[VulnKey, List[VulnRecord]] = {}
+        missing = []
+        with _POSITIVE_LOCK:
+            for key in keys:
+                vulns = _POSITIVE_CACHE.get(key)
+                if vulns is not None:
+                    found[key] = vulns
+                else:
+                    missing.append(key)
+        if missing:
+            from_disk = self.store.get_many(missing)
+            if from_disk:
+                with _POSITIVE_LOCK:
+                    _POSITIVE_CACHE.update(from_disk)
+                found.update(from_disk)
+        return found
+
+    def _save_positive(self, results: Dict[VulnKey, List[VulnRecord]]) -> None:
+        # Only hits are persisted: caching "no vulns" across scans could hide new advisories.
+        positives = {key: vulns for key, vulns in results.items() if vulns}
+        if not positives:
+            return
+        with _POSITIVE_LOCK:
+            _POSITIVE_CACHE.update(positives)
+        self.store.set_many(positives)
+
+    def _parse_vuln(self, v: Dict) -> VulnRecord:
+        """Normalize a raw OSV vulnerability object into a ``VulnRecord``."""
+        aliases = v.get("aliases") or []
+        summary = v.get("summary", "") or v.get("details", "")
+        severity = "UNKNOWN"
+        score = None
+        for s in v.get("severity", []):
+            severity = s.get("type", severity)
+            try:
+                score = float(s.get("score"))
+            except (TypeError, ValueError):
+                score = None
+        affected_range = ""
+        fixed_versions: set[str] = set()
+        for aff in v.get("affected", []):
+            ranges = aff.get("ranges", [])
+            if ranges:
+                events = ranges[0].get("events", [])
+                parts = []
+                for ev in events:
+                    if "introduced" in ev:
+                        parts.append(f">={ev['introduced']}")
+                    if "fixed" in ev:
+                        parts.append(f"<{ev['fixed']}")
+                        fixed_versions.add(ev["fixed"])
+                affected_range = " ".join(parts)
+            fixed_versions.update(aff.get("versions", []))
+        return {
+            "id": v.get("id") or (aliases[0] if aliases else ""),
+            "summary": summary,
+            "severity": severity,
+            "cvss_score": score,
+            "affected_range": affected_range,
+            "fixed_versions": sorted(fixed_versions),
+            "reference_url": (v.get("references") or [{}])[0].get("url", ""),
+        }
+
+    def _post(self, url: str, payload: Dict) -> Optional[requests.Response]:
+        """POST with backoff on throttling; returns ``None`` when OSV rejects the query."""
         tries = 0
         while tries < 3:
-            resp = self.session.post(self.api_url, json=payload, timeout=30)
+            resp = self.session.post(url, json=payload, timeout=30)
             if resp.status_code == 400:
                 # OSV returns 400 for invalid package/version combos; treat as no vulns
-                self.cache[key] = []
-                return []
+                return None
             if resp.status_code in (429, 503):
                 time.sleep(2 ** tries)
                 tries += 1
                 continue
-            resp.raise_for_status()
             break
-        data = resp.json()
-        vulns = []
-        for v in data.get("vulns", []):
-            aliases = v.get("aliases") or []
-            summary = v.get("summary", "") or v.get("details", "")
-            severity = "UNKNOWN"
-            score = None
-            for s in v.get("severity", []):
-                severity = s.get("type", severity)
-                try:
-                    score = float(s.get("score"))
-                except (TypeError, ValueError):
-                    score = None
-            affected_range = ""
-            fixed_versions: set[str] = set()
-            for aff in v.get("affected", []):
-                ranges = aff.get("ranges", [])
-                if ranges:
-                    events = ranges[0].get("events", [])
-                    parts = []
-                    for ev in events:
-                        if "introduced" in ev:
-                            parts.append(f">={ev['introduced']}")
-                        if "fixed" in ev:
-                            parts.append(f"<{ev['fixed']}")
-                            fixed_versions.add(ev["fixed"])
-                    affected_range = " ".join(parts)
-                fixed_versions.update(aff.get("versions", []))
-            vuln = {
-                "id": v.get("id") or aliases[0] if aliases else "",
-                "summary": summary,
-                "severity": severity,
-                "cvss_score": score,
-                "affected_range": affected_range,
-                "fixed_versions": sorted(fixed_versions),
-                "reference_url": v.get("references", [{}])[0].get("url", ""),
-            }
-            vulns.append(vuln)
-        self.cache[key] = vulns
+        resp.raise_for_status()
+        return resp
+
+    def _never_vulnerable(self, ecosystem: str, name: str) -> bool:
+        if self.bloom is None or not covers(ecosystem):
+            return False
+        return package_key(ecosystem, name) not in self.bloom
+
+    def lookup(self, ecosystem: str, name: str, version: str) -> List[VulnRecord]:
+        if not name or not version or version == "*":
+            return _EMPTY
+        key = (ecosystem.lower(), name.lower(), version)
+        cached = self._cache_get(self.cache, key)
+        if cached is not None:
+            return cached
+        if self._never_vulnerable(ecosystem, name):
+            self._cache_set(self.cache, key, _EMPTY)
+            return _EMPTY
+        persisted = self._load_positive([key]).get(key)
+        if persisted is not None:
+            self._cache_set(self.cache, key, persisted)
+            return persisted
+        payload = {"version": version, "package": {"ecosystem": ecosystem, "name": name}}
+        resp = self._post(self.api_url, payload)
+        if resp is None:
+            self._cache_set(self.cache, key, _EMPTY)
+            return _EMPTY
+        data = response_json(resp)
+        vulns = [self._parse_vuln(v) for v in data.get("vulns", [])]
+        self._cache_set(self.cache, key, vulns)
+        self._save_positive({key: vulns})
         return vulns
 
-    def bulk_lookup(self, deps: List[Dict[str, str]]) -> Dict[str, List[VulnRecord]]:
+    def _fetch_vuln(self, vuln_id: str) -> Optional[Dict]:
+        """Fetch a full OSV record by id (querybatch only returns ids)."""
+        cached = self._cache_get(self._vuln_details, vuln_id)
+        if cached is not None:
+            return cached
+        resp = self.session.get(f"{self.vulns_url}/{vuln_id}", timeout=30)
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        record = response_json(resp)
+        self._cache_set(self._vuln_details, vuln_id, record)
+        return record
+
+    def _fetch_vulns(self, vuln_ids: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """Fetch several OSV records concurrently, keyed by id."""
+        ids = list(vuln_ids)
+        if len(ids) <= 1:
+            return {vuln_id: self._fetch_vuln(vuln_id) for vuln_id in ids}
+        with ThreadPoolExecutor(max_workers=min(DETAIL_WORKERS, len(ids))) as pool:
+            return dict(zip(ids, pool.map(self._fetch_vuln, ids)))
+
+    def lookup_batch(self, queries: List[Tuple[str, str, str]]) -> List[List[VulnRecord]]:
+        """Resolve ``(ecosystem, name, version)`` queries via OSV's querybatch endpoint.
+
+        Returns one vuln list per query, in order. Cached and wildcard queries never
+        reach the network; the rest go out in chunks of ``OSV_BATCH_SIZE`` and the
+        returned ids are hydrated with a parallel ``/vulns/{id}`` fan-out.
+        """
+        # Results are collected locally so that LRU eviction during a large batch
+        # cannot push already-resolved deps back onto the one-request-per-dep path.
+        resolved: Dict[tuple, List[VulnRecord]] = {}
+        pending: Dict[tuple, tuple] = {}
+        for ecosystem, name, version in queries:
+            if not name or not version or version == "*":
+                continue
+            key = (ecosystem.lower(), name.lower(), version)
+            if key in resolved or key in pending:
+                continue
+            cached = self._cache_get(self.cache, key)
+            if cached is not None:
+                resolved[key] = cached
+            elif self._never_vulnerable(ecosystem, name):
+                resolved[key] = _EMPTY
+                self._cache_set(self.cache, key, _EMPTY)
+            else:
+                pending[key] = (ecosystem, name, version)
+
+        for key, vulns in self._load_positive(pending).items():
+            del pending[key]
+            resolved[key] = vulns
+            self._cache_set(self.cache, key, vulns)
+
+        fetched: Dict[VulnKey, List[VulnRecord]] = {}
+        items = list(pending.items())
+        for start in range(0, len(items), OSV_BATCH_SIZE):
+            chunk = items[start:start + OSV_BATCH_SIZE]
+            payload = {
+                "queries": [
+                    {"version": version, "package": {"ecosystem": ecosystem, "name": name}}
+                    for _, (ecosystem, name, version) in chunk
+                ]
+            }
+            resp = self._post(self.batch_url, payload)
+            if resp is None:
+                # One bad query rejects the whole batch; fall back to per-dep lookups.
+                for key, (ecosystem, name, version) in chunk:
+                    resolved[key] = self.lookup(ecosystem, name, version)
+                continue
+            hits = [
+                (key, result.get("vulns") or [])
+                for (key, _), result in zip(chunk, response_json(resp).get("results", []))
+            ]
+            # Batch responses normally carry only id/modified; fetch the full records.
+            records = self._fetch_vulns(
+                {v["id"] for _, found in hits for v in found if v.get("id") and "affected" not in v and "summary" not in v}
+            )
+            for key, found in hits:
+                vulns = []
+                for v in found:
+                    record = v if "affected" in v or "summary" in v else records.get(v.get("id", ""))
+                    if record:
+                        vulns.append(self._parse_vuln(record))
+                resolved[key] = fetched[key] = vulns
+                self._cache_set(self.cache, key, vulns)
+        self._save_positive(fetched)
+
+        return [
+            resolved.get((ecosystem.lower(), name.lower(), version), _EMPTY)
+            for ecosystem, name, version in queries
+        ]
+
+    def bulk_lookup_batched(self, deps: Dependencies) -> Dict[str, List[VulnRecord]]:
+        """Like ``bulk_lookup`` but resolves uncached deps through ``lookup_batch``."""
+        triples = list(_dep_triples(deps))
+        return {
+            f"{ecosystem}|{name}|{version}": vulns
+            for (ecosystem, name, version), vulns in zip(triples, self.lookup_batch(triples))
+        }
+
+    def bulk_lookup(self, deps: Dependencies) -> Dict[str, List[VulnRecord]]:
         """Lookup vulnerabilities for each dependency and return indexed results."""
-        results: Dict[str, List[VulnRecord]] = {}
-        for dep in deps:
-            key = f"{dep['ecosystem']}|{dep['name']}|{dep['version']}"
-            results[key] = self.lookup(dep["ecosystem"], dep["name"], dep["version"])
-        return results
+        # The same package often appears in several manifests; look each triple up once.
+        unique = dict.fromkeys(_dep_triples(deps))
+        return {
+            f"{ecosystem}|{name}|{version}": self.lookup(ecosystem, name, version)
+            for ecosystem, name, version in unique
+        }
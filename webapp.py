@@ -4,20 +4,38 @@ FastHTML entry point for the GitHub dependency auditor.
 Routes:
 - GET / : entry form
 - POST /scan : perform scan and render dashboard + summaries
-- GET /export/json : export the most recent results as JSON
-- GET /export/md : export a Markdown summary
-
-The app is synchronous for simplicity; the scanning pipeline is modular so it can
-be moved to background jobs or queues later.
+- GET /export/json?id=SCAN_ID : export a scan's results as JSON
+- GET /export/md?id=SCAN_ID : export a scan's Markdown summary
+- GET /repo?id=SCAN_ID&name=REPO : dependency details for one repo of a scan (loaded via htmx)
+- GET /progress : current scan progress as JSON
+- GET /assets/app-<hash> : page script (gzip-precompressed, cached long-term)
+
+The /scan route awaits the blocking scan pipeline on a dedicated thread pool, so the
+event loop and the sync routes (/progress, exports) stay responsive while it runs.
 """
 
 from __future__ import annotations
 
+import asyncio
 import datetime as dt
+import email.utils
+import functools
+import gzip
+import hashlib
 import os
 import requests
 import re
-from typing import Dict, List
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from html import escape
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from cachetools import TTLCache
 
 from fasthtml.common import (
     A,
@@ -31,20 +49,21 @@ from fasthtml.common import (
     Head,
     Html,
     Input,
-    JSONResponse,
     Li,
     Label,
     Link,
     Main,
+    NotStr,
     Option,
     P,
+    Response,
     Script,
     Select,
     Span,
+    StreamingResponse,
     Style,
     Table,
     Tbody,
-    Td,
     Th,
     Thead,
     Title,
@@ -52,19 +71,207 @@ from fasthtml.common import (
     Ul,
     fast_app,
 )
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
 
-from dependency_parsers import detect_manifests, parse_manifest
+from dependency_parsers import Dep, detect_manifests, parse_manifest
 from github_client import GitHubClient
-from risk_model import repo_risk, severity_rank
+from json_compat import dumps
+from risk_model import repo_risk
 from vuln_lookup import VulnerabilityLookup
 
-app, rt = fast_app()
+app, rt = fast_app(middleware=[Middleware(GZipMiddleware, minimum_size=1024)])
 
 tailwind = Script(src="https://cdn.tailwindcss.com")
+# _layout renders a full <html> page, so FastHTML's default headers (htmx included) are not added.
+htmx = Script(src="https://unpkg.com/htmx.org@2.0.3/dist/htmx.min.js")
+
+_APP_CSS = """
+body { background: #0b1021; color: #e8ecf3; }
+.card { background: #11182c; border: 1px solid #1f2a44; }
+.pill { border-radius: 9999px; padding: 2px 10px; }
+"""
+
+_APP_JS = """
+document.addEventListener("DOMContentLoaded", () => {
+    const form = document.querySelector("form[action='/scan']");
+    const statusBox = document.getElementById("status-box");
+    const statusText = document.getElementById("status-text");
+    const progressBar = document.getElementById("progress-bar");
+    const progressDetail = document.getElementById("progress-detail");
+    const submitBtn = document.getElementById("scan-submit");
+    const tokenHelpBtn = document.getElementById("token-help-toggle");
+    const tokenHelpBox = document.getElementById("token-help-box");
+    const osvHelpBtn = document.getElementById("osv-help-toggle");
+    const osvHelpBox = document.getElementById("osv-help-box");
+    const messages = [
+        "Sending request to GitHub...",
+        "Querying OSV for vulnerabilities...",
+        "Scoring repositories..."
+    ];
+    if (!form || !statusBox || !statusText) return;
+    let pollId = null;
+    form.addEventListener("submit", () => {
+        statusBox.classList.remove("hidden");
+        submitBtn?.setAttribute("disabled", "true");
+        submitBtn?.classList.add("opacity-60", "cursor-not-allowed");
+        let idx = 0;
+        statusText.textContent = messages[idx];
+        const id = setInterval(() => {
+            idx = (idx + 1) % messages.length;
+            statusText.textContent = messages[idx];
+        }, 2000);
+        // Stop cycling after a minute to avoid runaway loops on nav errors
+        setTimeout(() => clearInterval(id), 60000);
+        const poll = async () => {
+            try {
+                const resp = await fetch("/progress");
+                if (!resp.ok) return;
+                const data = await resp.json();
+                const {processed=0, total=0, current_repo="", state=""} = data;
+                const pct = total > 0 ? Math.min(100, Math.round((processed / total) * 100)) : 5;
+                if (progressBar) progressBar.style.width = `${pct}%`;
+                if (progressDetail) progressDetail.textContent = total ? `Processing ${current_repo || '...'} (${processed}/${total})` : (state || 'working...');
+            } catch (err) {
+                // swallow errors
+            }
+        };
+        poll();
+        pollId = setInterval(poll, 1200);
+        setTimeout(() => clearInterval(pollId), 120000);
+    });
+    window.addEventListener("pageshow", () => {
+        if (pollId) clearInterval(pollId);
+        if (progressBar) progressBar.style.width = "0%";
+        if (progressDetail) progressDetail.textContent = "Status: idle";
+        statusText.textContent = "Preparing scan...";
+        submitBtn?.removeAttribute("disabled");
+        submitBtn?.classList.remove("opacity-60", "cursor-not-allowed");
+    });
+    tokenHelpBtn?.addEventListener("click", () => {
+        if (!tokenHelpBox) return;
+        tokenHelpBox.classList.toggle("hidden");
+    });
+    osvHelpBtn?.addEventListener("click", () => {
+        if (!osvHelpBox) return;
+        osvHelpBox.classList.toggle("hidden");
+    });
+});
+"""
+
+# Built once at import: the page chrome never changes, so neither do these components.
+_APP_STYLE = Style(_APP_CSS)
+_APP_JS_BYTES = _APP_JS.encode("utf-8")
+_APP_JS_GZIP = gzip.compress(_APP_JS_BYTES, compresslevel=9)
+# Content hash in the URL lets the browser cache the script forever and still pick up edits.
+# The URL must not end in a static extension such as ".js": fast_app registers its
+# /{fname:path}.{ext:static} file route ahead of ours, and it would answer with a 404.
+_APP_JS_URL = f"/assets/app-{hashlib.blake2b(_APP_JS_BYTES, digest_size=6).hexdigest()}"
+_APP_SCRIPT = Script(src=_APP_JS_URL)
+
+_DIGIT_RE = re.compile(r"[0-9]+")
 
 DIRECTORIES_TO_SCAN = ["", "src", "app", "backend", "frontend", "server", "client"]
-_LATEST_RESULTS: Dict = {}
-_PROGRESS: Dict = {"state": "idle", "message": "", "current_repo": "", "processed": 0, "total": 0}
+# Finished scans by scan_id, so each user's export links keep pointing at their own results.
+SCAN_CACHE_SIZE = 32
+_SCAN_CACHE: "OrderedDict[str, Dict]" = OrderedDict()
+# Identical submissions within this window reuse the previous results instead of rescanning.
+SCAN_RESULT_TTL = 300
+_SCAN_RESULT_CACHE: TTLCache = TTLCache(maxsize=SCAN_CACHE_SIZE, ttl=SCAN_RESULT_TTL)
+_SCAN_CACHE_LOCK = threading.Lock()
+# Repos scanned in parallel; keep modest to stay within GitHub's 5000 req/hr token limit.
+SCAN_CONCURRENCY = int(os.getenv("SCAN_CONCURRENCY", "8"))
+# Whole scans run on their own pool: they block on HTTP for minutes, and in the shared
+# threadpool used for sync routes they would starve /progress polls and the exports.
+MAX_CONCURRENT_SCANS = int(os.getenv("MAX_CONCURRENT_SCANS", "4"))
+_SCAN_EXECUTOR = ThreadPoolExecutor(max_workers=max(1, MAX_CONCURRENT_SCANS), thread_name_prefix="scan")
+
+
+@dataclass
+class Progress:
+    state: str = "idle"
+    message: str = ""
+    current_repo: str = ""
+    processed: int = 0
+    total: int = 0
+
+
+_PROGRESS = Progress()
+# Guards every read and write of _PROGRESS so /progress never sees a half-applied update.
+_PROGRESS_LOCK = threading.Lock()
+
+
+def _update_progress(**fields) -> None:
+    with _PROGRESS_LOCK:
+        for key, value in fields.items():
+            setattr(_PROGRESS, key, value)
+
+
+def progress_snapshot() -> Dict:
+    """Consistent copy of the current scan progress."""
+    with _PROGRESS_LOCK:
+        return asdict(_PROGRESS)
+
+
+def _json(obj, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """JSON response encoded with orjson when available (see json_compat.dumps)."""
+    return Response(content=dumps(obj), status_code=status_code, media_type="application/json", headers=headers)
+
+
+def _store_scan(owner: str, results: List[Dict]) -> str:
+    scan_id = secrets.token_urlsafe(12)
+    with _SCAN_CACHE_LOCK:
+        _SCAN_CACHE[scan_id] = {
+            "owner": owner,
+            "results": results,
+            "by_name": {repo["name"]: repo for repo in results},
+            "ts": time.time(),
+        }
+        while len(_SCAN_CACHE) > SCAN_CACHE_SIZE:
+            _SCAN_CACHE.popitem(last=False)
+    return scan_id
+
+
+def _get_scan(scan_id: str) -> Optional[Dict]:
+    with _SCAN_CACHE_LOCK:
+        entry = _SCAN_CACHE.get(scan_id)
+        if entry is not None:
+            _SCAN_CACHE.move_to_end(scan_id)
+        return entry
+
+
+def _export_json_body(entry: Dict) -> bytes:
+    """JSON export for a stored scan, serialized (and hashed into an ETag) on first use only."""
+    body = entry.get("json")
+    if body is None:
+        # Dep records are dataclasses, so they serialize directly without copying the results.
+        body = dumps({"owner": entry["owner"], "results": entry["results"]})
+        with _SCAN_CACHE_LOCK:
+            entry["json"] = body
+            entry["etag"] = hashlib.blake2b(body, digest_size=8).hexdigest()
+    return body
+
+
+def _cache_headers(entry: Dict, variant: str) -> Dict[str, str]:
+    return {
+        "ETag": f'"{entry["etag"]}-{variant}"',
+        "Last-Modified": email.utils.formatdate(entry["ts"], usegmt=True),
+        "Cache-Control": "private, max-age=300",
+    }
+
+
+def _not_modified(req, headers: Dict[str, str]) -> bool:
+    wanted = req.headers.get("if-none-match")
+    if not wanted:
+        return False
+    etag = headers["ETag"]
+    return any(tag.strip().removeprefix("W/") in (etag, "*") for tag in wanted.split(","))
+
+
+def _scan_key(owner: str, include_forks: bool, min_updated: str, token: str) -> Tuple[str, bool, str, str]:
+    # Tokens can see different repos, so they are part of the key, but only as a digest.
+    token_hash = hashlib.blake2b(token.encode("utf-8"), digest_size=16).hexdigest() if token else ""
+    return (owner.lower(), include_forks, min_updated, token_hash)
 
 
 def _layout(*body):
@@ -72,13 +279,8 @@ def _layout(*body):
         Head(
             Title("GitHub Dependency Auditor"),
             tailwind,
-            Style(
-                """
-                body { background: #0b1021; color: #e8ecf3; }
-                .card { background: #11182c; border: 1px solid #1f2a44; }
-                .pill { border-radius: 9999px; padding: 2px 10px; }
-                """
-            ),
+            htmx,
+            _APP_STYLE,
         ),
         Body(
             Div(
@@ -90,87 +292,29 @@ def _layout(*body):
                 *body,
                 cls="max-w-7xl mx-auto py-10 px-6",
             ),
-            Script(
-                """
-                document.addEventListener("DOMContentLoaded", () => {
-                    const form = document.querySelector("form[action='/scan']");
-                    const statusBox = document.getElementById("status-box");
-                    const statusText = document.getElementById("status-text");
-                    const progressBar = document.getElementById("progress-bar");
-                    const progressDetail = document.getElementById("progress-detail");
-                    const submitBtn = document.getElementById("scan-submit");
-                    const tokenHelpBtn = document.getElementById("token-help-toggle");
-                    const tokenHelpBox = document.getElementById("token-help-box");
-                    const osvHelpBtn = document.getElementById("osv-help-toggle");
-                    const osvHelpBox = document.getElementById("osv-help-box");
-                    const messages = [
-                        "Sending request to GitHub...",
-                        "Querying OSV for vulnerabilities...",
-                        "Scoring repositories..."
-                    ];
-                    if (!form || !statusBox || !statusText) return;
-                    let pollId = null;
-                    form.addEventListener("submit", () => {
-                        statusBox.classList.remove("hidden");
-                        submitBtn?.setAttribute("disabled", "true");
-                        submitBtn?.classList.add("opacity-60", "cursor-not-allowed");
-                        let idx = 0;
-                        statusText.textContent = messages[idx];
-                        const id = setInterval(() => {
-                            idx = (idx + 1) % messages.length;
-                            statusText.textContent = messages[idx];
-                        }, 2000);
-                        // Stop cycling after a minute to avoid runaway loops on nav errors
-                        setTimeout(() => clearInterval(id), 60000);
-                        const poll = async () => {
-                            try {
-                                const resp = await fetch("/progress");
-                                if (!resp.ok) return;
-                                const data = await resp.json();
-                                const {processed=0, total=0, current_repo="", state=""} = data;
-                                const pct = total > 0 ? Math.min(100, Math.round((processed / total) * 100)) : 5;
-                                if (progressBar) progressBar.style.width = `${pct}%`;
-                                if (progressDetail) progressDetail.textContent = total ? `Processing ${current_repo || '...'} (${processed}/${total})` : (state || 'working...');
-                            } catch (err) {
-                                // swallow errors
-                            }
-                        };
-                        poll();
-                        pollId = setInterval(poll, 1200);
-                        setTimeout(() => clearInterval(pollId), 120000);
-                    });
-                    window.addEventListener("pageshow", () => {
-                        if (pollId) clearInterval(pollId);
-                        if (progressBar) progressBar.style.width = "0%";
-                        if (progressDetail) progressDetail.textContent = "Status: idle";
-                        statusText.textContent = "Preparing scan...";
-                        submitBtn?.removeAttribute("disabled");
-                        submitBtn?.classList.remove("opacity-60", "cursor-not-allowed");
-                    });
-                    tokenHelpBtn?.addEventListener("click", () => {
-                        if (!tokenHelpBox) return;
-                        tokenHelpBox.classList.toggle("hidden");
-                    });
-                    osvHelpBtn?.addEventListener("click", () => {
-                        if (!osvHelpBox) return;
-                        osvHelpBox.classList.toggle("hidden");
-                    });
-                });
-                """
-            ),
+            _APP_SCRIPT,
         ),
     )
 
 
-def severity_badge(sev: str):
-    colors = {
-        "CRITICAL": "bg-red-700",
-        "HIGH": "bg-red-500",
-        "MEDIUM": "bg-yellow-500 text-black",
-        "LOW": "bg-green-600",
-        "UNKNOWN": "bg-slate-500",
-    }
-    return Span(sev.title(), cls=f"pill text-xs font-semibold {colors.get(sev.upper(), 'bg-slate-500')}")
+_SEVERITY_COLORS = {
+    "CRITICAL": "bg-red-700",
+    "HIGH": "bg-red-500",
+    "MEDIUM": "bg-yellow-500 text-black",
+    "LOW": "bg-green-600",
+    "UNKNOWN": "bg-slate-500",
+}
+_SEVERITY_BADGE_HTML = {
+    sev: f'<span class="pill text-xs font-semibold {color}">{sev.title()}</span>'
+    for sev, color in _SEVERITY_COLORS.items()
+}
+
+
+def _severity_badge_html(sev: str) -> str:
+    badge = _SEVERITY_BADGE_HTML.get(sev.upper())
+    if badge is None:
+        badge = f'<span class="pill text-xs font-semibold bg-slate-500">{escape(sev.title())}</span>'
+    return badge
 
 
 def render_form():
@@ -255,7 +399,7 @@ def render_form():
                     Li("Maven: OSV-imported JVM advisories", cls="text-xs text-slate-300"),
                     cls="list-disc list-inside space-y-1"
                 ),
-                P("Lookups are read-only and cached in memory per scan.", cls="text-xs text-slate-300 mt-1"),
+                P("Lookups are read-only; known-vulnerable packages are cached for 24 hours.", cls="text-xs text-slate-300 mt-1"),
                 cls="space-y-1 mt-2 hidden",
                 id="osv-help-box",
             ),
@@ -281,42 +425,67 @@ def _format_reset(ts: str) -> str:
         return ts
 
 
+@functools.lru_cache(maxsize=16384)
 def _version_parts(ver: str):
-    base = ver.split("-", 1)[0]
+    chunks = ver.split("-", 1)[0].split(".")
+    # Plain dotted numbers ("1.2.3") are nearly every real version: convert them in one pass.
+    if all(map(str.isdecimal, chunks)):
+        return tuple(map(int, chunks))
     parts = []
-    for chunk in base.split("."):
-        m = re.match(r"([0-9]+)", chunk)
+    for chunk in chunks:
+        # Plain numeric chunks are the common case; only mixed ones like "1rc2" need the regex.
+        if chunk.isdecimal():
+            parts.append(int(chunk))
+            continue
+        m = _DIGIT_RE.match(chunk)
         if not m:
             return None
-        parts.append(int(m.group(1)))
+        parts.append(int(m.group(0)))
     return tuple(parts) if parts else None
 
 
+@functools.lru_cache(maxsize=16384)
+def _version_key(ver: str):
+    """``_version_parts`` with trailing zeros dropped, so "1.2" and "1.2.0" compare equal unpadded."""
+    parts = _version_parts(ver)
+    if parts is None:
+        return None
+    end = len(parts)
+    while end and parts[end - 1] == 0:
+        end -= 1
+    return parts[:end]
+
+
+@functools.lru_cache(maxsize=16384)
 def _is_newer_version(current: str, candidate: str) -> bool:
-    cur_parts = _version_parts(current)
-    cand_parts = _version_parts(candidate)
-    if not cur_parts or not cand_parts:
+    cur = _version_key(current)
+    cand = _version_key(candidate)
+    if cur is None or cand is None:
         return True  # if we can't compare, keep the candidate
-    # Pad shorter tuple with zeros for comparison
-    max_len = max(len(cur_parts), len(cand_parts))
-    cur = cur_parts + (0,) * (max_len - len(cur_parts))
-    cand = cand_parts + (0,) * (max_len - len(cand_parts))
+    # Chunks are non-negative, so comparing zero-stripped tuples matches zero-padded comparison.
     return cand > cur
 
 
-def render_repo_table(results: List[Dict]):
-    rows = []
-    for repo in results:
-        rows.append(
-            Tr(
-                Td(A(repo["name"], href=repo["html_url"], cls="text-indigo-300 underline"), cls="whitespace-nowrap"),
-                Td(repo["vulnerable_dependencies"], cls="whitespace-nowrap"),
-                Td(severity_badge(repo["highest_severity"]), cls="whitespace-nowrap"),
-                Td(repo["risk_score"], cls="whitespace-nowrap"),
-                Td(repo["pushed_at"], cls="whitespace-nowrap"),
-                cls="border-b border-slate-800",
-            )
-        )
+def _repo_row_html(repo: Dict, scan_id: str) -> str:
+    # Name goes in the query: a path ending in ".js"/".css" (e.g. "reveal.js") would be
+    # claimed by fast_app's static file route and 404.
+    detail_url = f"/repo?id={scan_id}&name={quote(repo['name'], safe='')}"
+    return (
+        '<tr class="border-b border-slate-800">'
+        f'<td class="whitespace-nowrap"><a href="#detail" hx-get="{escape(detail_url)}" hx-target="#detail" hx-swap="innerHTML" '
+        f'class="text-indigo-300 underline">{escape(repo["name"])}</a></td>'
+        f'<td class="whitespace-nowrap">{repo["vulnerable_dependencies"]}</td>'
+        f'<td class="whitespace-nowrap">{_severity_badge_html(repo["highest_severity"])}</td>'
+        f'<td class="whitespace-nowrap">{repo["risk_score"]}</td>'
+        f'<td class="whitespace-nowrap">{escape(str(repo["pushed_at"]))}</td>'
+        "</tr>"
+    )
+
+
+def render_repo_table(results: List[Dict], scan_id: str):
+    """Summary table; clicking a repo loads its dependency details into ``#detail``."""
+    # Rows are emitted as pre-escaped HTML; building a component per cell dominates large reports.
+    rows = NotStr("".join(_repo_row_html(repo, scan_id) for repo in results))
     return Div(
         H2("Repositories", cls="text-xl font-semibold mb-3"),
         Table(
@@ -329,7 +498,7 @@ def render_repo_table(results: List[Dict]):
                     Th("Last updated", cls="text-left p-2 whitespace-nowrap"),
                 )
             ),
-            Tbody(*rows),
+            Tbody(rows),
             cls="w-full text-sm",
         ),
         cls="card p-4 overflow-x-auto"
@@ -361,52 +530,30 @@ def render_owner_summary(owner: str, results: List[Dict]):
     )
 
 
+def _vuln_html(v: Dict) -> str:
+    return (
+        '<div class="space-y-1">'
+        f'<span class="font-semibold">{escape(v["id"])}</span>'
+        f'{_severity_badge_html(v.get("severity", "LOW"))}'
+        f'<p class="text-slate-300 text-sm">{escape(v["summary"])}</p>'
+        f'<span class="text-xs text-slate-400">Affected: {escape(v.get("affected_range", ""))}</span>'
+        f'<a href="{escape(v.get("reference_url") or "#")}" class="text-indigo-300 text-xs underline">Advisory</a>'
+        "</div>"
+    )
+
+
 def render_dependency_details(repo: Dict):
     rows = []
     for item in repo["dependencies"]:
         dep = item["dependency"]
         vulns = item["vulnerabilities"]
-        fixes = []
-        for v in vulns:
-            fixes.extend(v.get("fixed_versions", []))
-        # Deduplicate and show the first two recommended versions, if present
-        unique_fixes = []
-        seen = set()
-        for fv in fixes:
-            if not fv or fv in seen:
-                continue
-            if not _is_newer_version(dep.get("version", ""), fv):
-                continue
-            if len(unique_fixes) >= 2:
-                continue
-            seen.add(fv)
-            unique_fixes.append(fv)
-        recommended = ", ".join(unique_fixes[:2]) or "n/a"
+        recommended = item["recommended"]
         rows.append(
-            Tr(
-                Td(dep["name"]),
-                Td(dep["version"]),
-                Td(dep["ecosystem"]),
-                Td(len(vulns)),
-                Td(recommended),
-                Td(
-                    Div(
-                        *[
-                            Div(
-                                Span(v["id"], cls="font-semibold"),
-                                severity_badge(v.get("severity", "LOW")),
-                                P(v["summary"], cls="text-slate-300 text-sm"),
-                                Span(f"Affected: {v.get('affected_range', '')}", cls="text-xs text-slate-400"),
-                                A("Advisory", href=v.get("reference_url") or "#", cls="text-indigo-300 text-xs underline"),
-                                cls="space-y-1"
-                            )
-                            for v in vulns
-                        ],
-                        cls="space-y-2"
-                    )
-                ),
-                cls="align-top border-b border-slate-800"
-            )
+            '<tr class="align-top border-b border-slate-800">'
+            f"<td>{escape(dep.name)}</td><td>{escape(dep.version)}</td><td>{escape(dep.ecosystem)}</td>"
+            f"<td>{len(vulns)}</td><td>{escape(recommended)}</td>"
+            f'<td><div class="space-y-2">{"".join(_vuln_html(v) for v in vulns)}</div></td>'
+            "</tr>"
         )
     return Div(
         H3("Dependency details", cls="text-lg font-semibold mb-3"),
@@ -421,7 +568,7 @@ def render_dependency_details(repo: Dict):
                     Th("Vulnerabilities", cls="text-left p-2 whitespace-nowrap"),
                 )
             ),
-            Tbody(*rows),
+            Tbody(NotStr("".join(rows))),
             cls="w-full text-sm"
         ),
         cls="card p-4 overflow-x-auto"
@@ -431,7 +578,7 @@ def render_dependency_details(repo: Dict):
 def render_repo_detail(repo: Dict):
     meta = repo["meta"]
     return Div(
-        H2(f"{meta.get('full_name')}", cls="text-xl font-semibold mb-3"),
+        H2(A(f"{meta.get('full_name')}", href=repo["html_url"], cls="underline"), cls="text-xl font-semibold mb-3"),
         Div(
             P(meta.get("description") or "No description", cls="text-slate-300"),
             Div(
@@ -453,39 +600,95 @@ def render_repo_detail(repo: Dict):
     )
 
 
+def _fetch_manifests(gh: GitHubClient, owner: str, repo: Dict) -> Dict[str, Optional[str]]:
+    """Return manifest path -> text, preferring the git-tree listing over per-directory calls."""
+    name = repo["name"]
+    branch = gh.default_branch(owner, name, known=repo.get("default_branch"))
+    if not branch:
+        return {}
+    blobs = gh.list_manifest_blobs(owner, name, DIRECTORIES_TO_SCAN, branch=branch)
+    if blobs is not None:
+        shas = dict(blobs)
+        paths = list(shas)
+    else:
+        # Tree was truncated; fall back to walking the scan directories.
+        shas = None
+        paths = detect_manifests(gh.list_repository_files_parallel(owner, name, DIRECTORIES_TO_SCAN))
+    return gh.fetch_files_text_raw(owner, name, branch, paths, shas)
+
+
+def _collect_repo_deps(repo: Dict, owner: str, gh: GitHubClient) -> List[Dep]:
+    contents = _fetch_manifests(gh, owner, repo)
+    return [dep for manifest, content in contents.items() if content for dep in parse_manifest(manifest, content)]
+
+
+def _recommended_versions(current: str, vulns: List) -> str:
+    """First two distinct fixed versions newer than ``current``, or "n/a"."""
+    unique_fixes = []
+    seen = set()
+    for v in vulns:
+        for fv in v.get("fixed_versions", []):
+            if not fv or fv in seen:
+                continue
+            if not _is_newer_version(current, fv):
+                continue
+            seen.add(fv)
+            unique_fixes.append(fv)
+            if len(unique_fixes) >= 2:
+                return ", ".join(unique_fixes)
+    return ", ".join(unique_fixes) or "n/a"
+
+
+def _repo_result(repo: Dict, deps: List[Dep], found: Dict[Tuple[str, str, str], List]) -> Dict:
+    dependencies = []
+    for dep in deps:
+        vulns = found[(dep.ecosystem, dep.name, dep.version)]
+        # Derived once here so re-renders of the detail view and the exports reuse it.
+        recommended = _recommended_versions(dep.version, vulns) if vulns else "n/a"
+        dependencies.append({"dependency": dep, "vulnerabilities": vulns, "recommended": recommended})
+    scores = repo_risk(dependencies)
+    return {
+        "name": repo["name"],
+        "html_url": repo["html_url"],
+        "pushed_at": repo["pushed_at"],
+        "meta": repo,
+        "dependencies": dependencies,
+        **scores,
+    }
+
+
 def scan_owner(owner: str, include_forks: bool, min_updated: str, token: str = ""):
     min_dt = dt.datetime.fromisoformat(min_updated) if min_updated else None
     gh = GitHubClient(token=token or None)
     vulns = VulnerabilityLookup()
     repos = gh.fetch_repos(owner, include_forks=include_forks, min_updated=min_dt)
-    _PROGRESS.update({"state": "scanning", "message": "Scanning repositories", "processed": 0, "total": len(repos)})
-    results = []
-    for repo in repos:
-        _PROGRESS.update({"current_repo": repo.get("name", ""), "processed": len(results)})
-        files = gh.list_repository_files(owner, repo["name"], DIRECTORIES_TO_SCAN)
-        manifests = detect_manifests(files)
-        dependencies = []
-        for manifest in manifests:
-            content = gh.fetch_file_text(owner, repo["name"], manifest)
-            if not content:
-                continue
-            deps = parse_manifest(manifest, content)
-            for dep in deps:
-                vulns_for_dep = vulns.lookup(dep["ecosystem"], dep["name"], dep["version"])
-                dependencies.append({"dependency": dep, "vulnerabilities": vulns_for_dep})
-        scores = repo_risk(dependencies)
-        results.append(
-            {
-                "name": repo["name"],
-                "html_url": repo["html_url"],
-                "pushed_at": repo["pushed_at"],
-                "meta": repo,
-                "dependencies": dependencies,
-                **scores,
-            }
-        )
-        _PROGRESS.update({"processed": len(results)})
-    _PROGRESS.update({"state": "done", "message": "Complete", "current_repo": "", "processed": len(results)})
+    _update_progress(state="scanning", message="Fetching manifests", processed=0, total=len(repos))
+
+    # Pass 1: fetch and parse every repo's manifests. Repos are I/O-bound and
+    # independent; per_repo keeps the listing order.
+    per_repo: List[List[Dep]] = [[] for _ in repos]
+    processed = 0
+    executor = ThreadPoolExecutor(max_workers=max(1, SCAN_CONCURRENCY))
+    try:
+        futures = {executor.submit(_collect_repo_deps, repo, owner, gh): idx for idx, repo in enumerate(repos)}
+        for future in as_completed(futures):
+            idx = futures[future]
+            per_repo[idx] = future.result()
+            processed += 1
+            _update_progress(current_repo=repos[idx].get("name", ""), processed=processed)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    # Pass 2: resolve each distinct (ecosystem, name, version) once for the whole
+    # owner, so a dependency shared by many repos costs a single OSV query.
+    _update_progress(message="Querying OSV for vulnerabilities", current_repo="")
+    unique = list(dict.fromkeys((dep.ecosystem, dep.name, dep.version) for deps in per_repo for dep in deps))
+    found = dict(zip(unique, vulns.lookup_batch(unique)))
+
+    # Pass 3: attach results and score each repo.
+    _update_progress(message="Scoring repositories")
+    results = [_repo_result(repo, deps, found) for repo, deps in zip(repos, per_repo)]
+    _update_progress(state="done", message="Complete", current_repo="", processed=processed)
     return results
 
 
@@ -501,11 +704,19 @@ def index():
 
 
 @rt("/scan", methods=["POST"])
-def scan(owner: str, forks: str = "yes", min_updated: str = "", token: str = ""):
+async def scan(owner: str, forks: str = "yes", min_updated: str = "", token: str = ""):
     include_forks = forks != "no"
-    _PROGRESS.update({"state": "starting", "message": "Starting scan", "current_repo": "", "processed": 0, "total": 0})
+    key = _scan_key(owner, include_forks, min_updated, token)
+    with _SCAN_CACHE_LOCK:
+        results = _SCAN_RESULT_CACHE.get(key)
+    if results is not None:
+        _update_progress(state="done", message="Complete (cached)", current_repo="", processed=len(results), total=len(results))
+        return _render_results(owner, results)
+    _update_progress(state="starting", message="Starting scan", current_repo="", processed=0, total=0)
     try:
-        results = scan_owner(owner, include_forks, min_updated, token=token)
+        results = await asyncio.get_running_loop().run_in_executor(
+            _SCAN_EXECUTOR, functools.partial(scan_owner, owner, include_forks, min_updated, token=token)
+        )
     except RuntimeError as exc:
         msg = str(exc)
         if "rate limit" in msg.lower():
@@ -514,75 +725,127 @@ def scan(owner: str, forks: str = "yes", min_updated: str = "", token: str = "")
             error_text = f"GitHub rate limit reached. Retry after {friendly} or provide a GITHUB_TOKEN."
         else:
             error_text = f"Unexpected error: {msg}"
-        _LATEST_RESULTS.clear()
         return _layout(
             render_form(),
             render_error(error_text),
         )
     except requests.exceptions.RequestException as exc:
-        _LATEST_RESULTS.clear()
         return _layout(
             render_form(),
             render_error(f"Could not reach required APIs: {exc}"),
         )
     except Exception as exc:  # noqa: BLE001
-        _LATEST_RESULTS.clear()
         return _layout(
             render_form(),
             render_error(f"Unexpected error: {exc}"),
         )
     else:
-        global _LATEST_RESULTS
-        _LATEST_RESULTS = {"owner": owner, "results": results}
-        return _layout(
-            render_form(),
+        with _SCAN_CACHE_LOCK:
+            _SCAN_RESULT_CACHE[key] = results
+        return _render_results(owner, results)
+
+
+def _render_results(owner: str, results: List[Dict]):
+    scan_id = _store_scan(owner, results)
+    return _layout(
+        render_form(),
+        Div(
             Div(
-                Div(
-                    A("Export JSON", href="/export/json", cls="text-indigo-300 underline mr-4"),
-                    A("Export Markdown", href="/export/md", cls="text-indigo-300 underline"),
-                    cls="flex justify-end mb-2"
-                ),
-                render_owner_summary(owner, results),
-                render_repo_table(results),
-                *[render_repo_detail(r) for r in results],
-                cls="space-y-4"
+                A("Export JSON", href=f"/export/json?id={scan_id}", cls="text-indigo-300 underline mr-4"),
+                A("Export Markdown", href=f"/export/md?id={scan_id}", cls="text-indigo-300 underline"),
+                cls="flex justify-end mb-2"
             ),
-        )
+            render_owner_summary(owner, results),
+            render_repo_table(results, scan_id),
+            # Per-repo details are fetched on demand from /repo; shipping them all up front
+            # made the page several megabytes for large owners.
+            Div(P("Select a repository to see its dependency details.", cls="text-slate-400"), id="detail"),
+            cls="space-y-4"
+        ),
+    )
 
 
-@rt("/export/json")
-def export_json():
-    return JSONResponse(_LATEST_RESULTS or {})
+@rt("/repo")
+def repo_detail(id: str = "", name: str = ""):
+    entry = _get_scan(id)
+    repo = entry["by_name"].get(name) if entry else None
+    if repo is None:
+        return Div(P("This scan has expired or does not include that repository; run the scan again.", cls="text-slate-300"), cls="card p-4")
+    return render_repo_detail(repo)
 
 
-@rt("/export/md")
-def export_md():
-    if not _LATEST_RESULTS:
-        return "No results available."
-    owner = _LATEST_RESULTS.get("owner")
-    lines = [f"# Security report for {owner}", ""]
-    for repo in _LATEST_RESULTS["results"]:
-        lines.append(f"## {repo['name']} (risk {repo['risk_score']}, highest {repo['highest_severity']})")
+@rt(_APP_JS_URL)
+def static_app_js(req):
+    headers = {"Cache-Control": "public, max-age=31536000, immutable", "Vary": "Accept-Encoding"}
+    if "gzip" in req.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=_APP_JS_GZIP, media_type="application/javascript", headers=headers)
+    return Response(content=_APP_JS_BYTES, media_type="application/javascript", headers=headers)
+
+
+@rt("/export/json")
+def export_json(req, id: str = ""):
+    entry = _get_scan(id)
+    if not entry:
+        return _json({})
+    body = _export_json_body(entry)
+    headers = _cache_headers(entry, "json")
+    if _not_modified(req, headers):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _md_stream(latest: Dict):
+    yield f"# Security report for {latest.get('owner')}\n\n"
+    for repo in latest["results"]:
+        yield f"## {repo['name']} (risk {repo['risk_score']}, highest {repo['highest_severity']})\n"
         for item in repo["dependencies"]:
-            dep = item["dependency"]
             vulns = item["vulnerabilities"]
             if not vulns:
                 continue
-            lines.append(f"- {dep['name']} {dep['version']} ({dep['ecosystem']}): {len(vulns)} issues")
+            dep = item["dependency"]
+            yield f"- {dep.name} {dep.version} ({dep.ecosystem}): {len(vulns)} issues (recommended: {item['recommended']})\n"
             for v in vulns:
                 fix = ", ".join(v.get("fixed_versions", [])[:1]) or "n/a"
-                lines.append(f"  - {v['id']}: {v['summary']} (fix: {fix})")
-        lines.append("")
-    return "\n".join(lines)
+                yield f"  - {v['id']}: {v['summary']} (fix: {fix})\n"
+        yield "\n"
+
+
+@rt("/export/md")
+def export_md(req, id: str = ""):
+    entry = _get_scan(id)
+    if not entry:
+        return "No results available."
+    # The ETag is derived from the JSON serialization, which covers everything the summary shows.
+    _export_json_body(entry)
+    headers = _cache_headers(entry, "md")
+    if _not_modified(req, headers):
+        return Response(status_code=304, headers=headers)
+    return StreamingResponse(_md_stream(entry), media_type="text/markdown", headers=headers)
 
 
 @rt("/progress")
 def progress():
-    return JSONResponse(_PROGRESS)
+    return _json(progress_snapshot())
 
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", "8000"))
+    # Scan results and progress are process-local, so extra workers need a sticky load balancer.
+    workers = max(1, int(os.getenv("WEB_WORKERS", "1")))
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    try:
+        import uvloop  # noqa: F401
+
+        loop = "uvloop"
+    except ImportError:  # unix-only; fall back to the stdlib event loop
+        loop = "asyncio"
+    try:
+        import httptools  # noqa: F401
+
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+    # uvicorn can only spawn workers from an import string.
+    uvicorn.run("webapp:app" if workers > 1 else app, host="0.0.0.0", port=port, workers=workers, loop=loop, http=http)